@@ -3,11 +3,46 @@ Main API router for v1 endpoints
 Comprehensive PDF processing API with file management
 """
 
-from fastapi import APIRouter
+import orjson
+
+from fastapi import APIRouter, Response
 from app.api.v1.endpoints import pdf_operations_controller, file_management_controller
 
 api_router = APIRouter()
 
+# The health payload never changes at runtime, so it is serialized once at import
+API_HEALTH_INFO = {
+    "status": "healthy",
+    "version": "v1",
+    "available_endpoints": {
+        "pdf_operations": [
+            "/pdf/edit - Edit PDF documents",
+            "/pdf/split - Split PDF into multiple files", 
+            "/pdf/merge - Merge multiple PDFs",
+            "/pdf/download/{file_id} - Download processed files",
+            "/pdf/status/{file_id} - Check processing status"
+        ],
+        "file_management": [
+            "/files/upload - Upload files for processing",
+            "/files/validate/{filename} - Validate file format"
+        ],
+        "system": [
+            "/health - API health check"
+        ]
+    },
+    "services": {
+        "pdf_processor": "operational",
+        "file_storage": "operational", 
+        "background_tasks": "operational"
+    },
+    "limits": {
+        "max_file_size": "50MB",
+        "max_files_per_request": 10,
+        "supported_formats": ["PDF"]
+    }
+}
+API_HEALTH_BODY = orjson.dumps(API_HEALTH_INFO)
+
 # Include PDF operations routes
 api_router.include_router(
     pdf_operations_controller.router, 
@@ -47,33 +82,4 @@ async def api_health():
     - **Development**: Verify API is running during development
     - **Integration**: Confirm API availability before processing
     """
-    return {
-        "status": "healthy",
-        "version": "v1",
-        "available_endpoints": {
-            "pdf_operations": [
-                "/pdf/edit - Edit PDF documents",
-                "/pdf/split - Split PDF into multiple files", 
-                "/pdf/merge - Merge multiple PDFs",
-                "/pdf/download/{file_id} - Download processed files",
-                "/pdf/status/{file_id} - Check processing status"
-            ],
-            "file_management": [
-                "/files/upload - Upload files for processing",
-                "/files/validate/{filename} - Validate file format"
-            ],
-            "system": [
-                "/health - API health check"
-            ]
-        },
-        "services": {
-            "pdf_processor": "operational",
-            "file_storage": "operational", 
-            "background_tasks": "operational"
-        },
-        "limits": {
-            "max_file_size": "50MB",
-            "max_files_per_request": 10,
-            "supported_formats": ["PDF"]
-        }
-    }
+    return Response(content=API_HEALTH_BODY, media_type="application/json")
@@ -5,37 +5,44 @@ Following Java naming convention with 'Controller' suffix
 """
 
 from fastapi import APIRouter, UploadFile, File, HTTPException, status, Path
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from typing import List, Optional
 from pydantic import BaseModel, Field
 import os
+import orjson
 from pathlib import Path as PathLib
+from uuid import uuid4
 
+from app.core.config import settings
 from app.core.logger import logger
-from app.core.security import validate_file_extension, sanitize_filename
+from app.core.security import sanitize_filename
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# Extensions accepted by this controller, checked inline with a set lookup
+_ALLOWED_EXTS = frozenset({".pdf"})
 
 class FileInfo(BaseModel):
     """File information response model"""
-    filename: str = Field(..., description="Sanitized filename", example="document.pdf")
-    size: int = Field(..., description="File size in bytes", example=1048576)
-    mime_type: str = Field(..., description="MIME type of the file", example="application/pdf")
-    file_id: str = Field(..., description="Unique file identifier", example="file_0")
+    filename: str = Field(..., description="Sanitized filename", json_schema_extra={"example": "document.pdf"})
+    size: int = Field(..., description="File size in bytes", json_schema_extra={"example": 1048576})
+    mime_type: str = Field(..., description="MIME type of the file", json_schema_extra={"example": "application/pdf"})
+    file_id: str = Field(..., description="Unique file identifier", json_schema_extra={"example": "3f2a9c1e7b4d"})
 
 class UploadResponse(BaseModel):
     """File upload response model"""
-    success: bool = Field(..., description="Upload operation success status", example=True)
-    message: str = Field(..., description="Upload operation message", example="Successfully uploaded 2 files")
+    success: bool = Field(..., description="Upload operation success status", json_schema_extra={"example": True})
+    message: str = Field(..., description="Upload operation message", json_schema_extra={"example": "Successfully uploaded 2 files"})
     files: List[FileInfo] = Field(..., description="List of uploaded file information")
 
 @router.post(
     "/upload", 
-    response_model=UploadResponse,
+    response_model=None,
     summary="Upload Files for Processing",
     description="Upload one or more PDF files for processing operations",
     responses={
         200: {
+            "model": UploadResponse,
             "description": "Files uploaded successfully",
             "content": {
                 "application/json": {
@@ -47,13 +54,13 @@ class UploadResponse(BaseModel):
                                 "filename": "document1.pdf",
                                 "size": 1048576,
                                 "mime_type": "application/pdf",
-                                "file_id": "file_0"
+                                "file_id": "3f2a9c1e7b4d"
                             },
                             {
                                 "filename": "document2.pdf", 
                                 "size": 2097152,
                                 "mime_type": "application/pdf",
-                                "file_id": "file_1"
+                                "file_id": "8c0d5e6a91f2"
                             }
                         ]
                     }
@@ -112,36 +119,68 @@ async def upload_files(
     ```
     """
     try:
-        uploaded_files = []
+        if len(files) > settings.MAX_FILES_PER_REQUEST:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Too many files: maximum is {settings.MAX_FILES_PER_REQUEST} per request"
+            )
         
-        for file in files:
-            if not validate_file_extension(file.filename):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid file type: {file.filename}"
-                )
-            
-            file_info = FileInfo(
-                filename=sanitize_filename(file.filename),
-                size=file.size or 0,
-                mime_type=file.content_type or "application/octet-stream",
-                file_id=f"file_{len(uploaded_files)}"
+        # Validate the whole batch first, then build every entry in one pass
+        invalid = [file.filename for file in files
+                   if PathLib(file.filename or "").suffix.lower() not in _ALLOWED_EXTS]
+        if invalid:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid file type: {invalid[0]}"
             )
-            uploaded_files.append(file_info)
         
-        return UploadResponse(
-            success=True,
-            message=f"Successfully uploaded {len(uploaded_files)} files",
-            files=uploaded_files
-        )
+        # Enforce size limits before any file content is read
+        sizes = [file.size or 0 for file in files]
+        oversized = [file.filename for file, size in zip(files, sizes) if size > settings.MAX_FILE_SIZE]
+        if oversized or sum(sizes) > settings.MAX_REQUEST_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large: {oversized[0]}" if oversized else "Total upload size exceeds 500MB"
+            )
         
+        # Server-built data: plain dicts skip re-validating through FileInfo
+        _sanitize = sanitize_filename
+        uploaded_files = [
+            {
+                "filename": _sanitize(file.filename),
+                "size": size,
+                "mime_type": file.content_type or "application/octet-stream",
+                "file_id": uuid4().hex[:12]
+            }
+            for file, size in zip(files, sizes)
+        ]
+        
+        return ORJSONResponse({
+            "success": True,
+            "message": f"Successfully uploaded {len(uploaded_files)} files",
+            "files": uploaded_files
+        })
+        
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"File upload error: {str(e)}")
+        logger.error("File upload error: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="File upload failed"
         )
 
+# Pre-serialized tails of the two possible /validate bodies; only the
+# filename is encoded per request
+_VALIDATION_TAILS = {
+    is_valid: orjson.dumps({
+        "is_valid": is_valid,
+        "supported_formats": [".pdf"],
+        "message": "File is valid" if is_valid else "Unsupported file format"
+    })[1:]
+    for is_valid in (True, False)
+}
+
 @router.get(
     "/validate/{filename}",
     summary="Validate File Format",
@@ -179,7 +218,7 @@ async def upload_files(
     tags=["File Management"]
 )
 async def validate_file(
-    filename: str = Path(..., description="Filename to validate", example="document.pdf")
+    filename: str = Path(..., description="Filename to validate", examples=["document.pdf"])
 ):
     """
     ## Validate File Format
@@ -226,17 +265,12 @@ async def validate_file(
     ```
     """
     try:
-        is_valid = validate_file_extension(filename)
-        
-        return {
-            "filename": filename,
-            "is_valid": is_valid,
-            "supported_formats": [".pdf"],
-            "message": "File is valid" if is_valid else "Unsupported file format"
-        }
+        is_valid = PathLib(filename).suffix.lower() in _ALLOWED_EXTS
+        body = b'{"filename":' + orjson.dumps(filename) + b"," + _VALIDATION_TAILS[is_valid]
+        return Response(content=body, media_type="application/json")
         
     except Exception as e:
-        logger.error(f"File validation error: {str(e)}")
+        logger.error("File validation error: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="File validation failed"
@@ -4,19 +4,146 @@ Core PDF editing, splitting, and merging operations
 Following Java naming convention with 'Controller' suffix
 """
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, BackgroundTasks
-from fastapi.responses import FileResponse
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, status, BackgroundTasks, Depends, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import FileResponse, ORJSONResponse, Response, StreamingResponse
+from typing import TYPE_CHECKING, List, Optional, Dict, Any, Union
 from pydantic import BaseModel
-import tempfile
+import asyncio
+import time
 import os
-from pathlib import Path
+import re
+from functools import lru_cache
+from pathlib import Path as PathLib
 
+from app.core.buffer_pool import copy_upload
+from app.core.config import settings
 from app.core.logger import logger
-from app.services.pdf_service import PDFService
+from app.core.upload_cache import UploadCache
 from app.core.security import generate_session_id, sanitize_filename, validate_file_extension
 
-router = APIRouter()
+if TYPE_CHECKING:
+    from app.services.pdf_service import PDFService
+
+router = APIRouter(default_response_class=ORJSONResponse)
+
+
+@lru_cache(maxsize=1)
+def get_pdf_service() -> "PDFService":
+    """
+    Shared PDFService instance, created on first use and reused across requests.
+    The service module (PyMuPDF, reportlab, PIL) is imported here rather than at
+    module load, so importing this controller stays cheap.
+    """
+    from app.services.pdf_service import PDFService
+    return PDFService()
+
+# ========================
+# UPLOAD HELPERS
+# ========================
+
+# Form-field grammars for split selections, e.g. "1,3,5" and "1-5,8-10"
+_PAGE_RE = re.compile(r"\d+")
+_RANGE_RE = re.compile(r"(\d+)\s*-\s*(\d+)")
+
+# Upper bound on the highlight rects field, e.g. "10,10,100,30;10,40,200,60"
+_MAX_RECTS = 1000
+
+# Upper bound on the merge_order form field, far above any real file count
+_MAX_MERGE_ORDER_LEN = 4096
+
+def _parse_rects(rects: str) -> List[List[float]]:
+    """Parse "x0,y0,x1,y1;x0,y0,x1,y1" into rectangles; ValueError if malformed"""
+    parts = rects.split(";", _MAX_RECTS)
+    if len(parts) > _MAX_RECTS:
+        raise ValueError(f"Too many rectangles; at most {_MAX_RECTS} are allowed")
+    parsed = []
+    for part in parts:
+        coords = [float(c) for c in part.split(",")]
+        if len(coords) != 4:
+            raise ValueError(f"Invalid rectangle: {part}")
+        parsed.append(coords)
+    return parsed
+
+# Per-worker scratch root, created once; requests only add their session dir
+_SCRATCH_ROOT = PathLib(settings.PDF_PRODIGY_TEMP).resolve() / "pdf_editor"
+_SCRATCH_ROOT.mkdir(parents=True, exist_ok=True)
+
+# Merge inputs are deduplicated by content; the cache sits under the scratch
+# root so cached copies can be hard-linked into session directories
+_UPLOAD_CACHE = UploadCache(_SCRATCH_ROOT / "upload_cache", settings.UPLOAD_CACHE_SIZE)
+
+
+def _link_tmpfile(fd: int, dest: Union[str, PathLib]) -> None:
+    """Give an O_TMPFILE inode a name, replacing any file already at ``dest``"""
+    # Passing a dir fd makes os.link use linkat(AT_SYMLINK_FOLLOW), which
+    # resolves the /proc magic link instead of hard-linking the link itself
+    parent, name = os.path.split(dest)
+    dir_fd = os.open(parent, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        try:
+            os.link(f"/proc/self/fd/{fd}", name, dst_dir_fd=dir_fd)
+        except FileExistsError:
+            os.unlink(name, dir_fd=dir_fd)
+            os.link(f"/proc/self/fd/{fd}", name, dst_dir_fd=dir_fd)
+    finally:
+        os.close(dir_fd)
+
+
+def _persist_upload(upload: UploadFile, dest: Union[str, PathLib]) -> None:
+    """
+    Stream an uploaded file to disk without buffering it entirely in memory.
+    Blocking - call through run_in_threadpool so the event loop stays free.
+    
+    Where supported, the data goes into an anonymous O_TMPFILE inode that is
+    only linked at ``dest`` once complete, so a crash never leaves a partial file.
+    """
+    parent = os.path.dirname(dest)
+    try:
+        os.mkdir(parent)
+    except FileExistsError:
+        pass
+    
+    fd = None
+    if hasattr(os, "O_TMPFILE"):
+        try:
+            fd = os.open(parent, os.O_TMPFILE | os.O_WRONLY | os.O_CLOEXEC, 0o600)
+        except OSError:
+            fd = None  # Filesystem without O_TMPFILE support
+    anonymous = fd is not None
+    if not anonymous:
+        fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+    
+    try:
+        copy_upload(upload.file, fd)
+        if anonymous:
+            _link_tmpfile(fd, dest)
+    finally:
+        os.close(fd)
+
+
+def _in_memory_bytes(upload: UploadFile) -> Optional[bytes]:
+    """Return the contents of an upload that never spilled to disk, else None"""
+    # Starlette keeps parts under 1 MiB in memory; those are parsed straight
+    # from bytes rather than written out and read back
+    if getattr(upload.file, "_rolled", True):
+        return None
+    upload.file.seek(0)
+    return upload.file.read()
+
+
+def _persist_cached_upload(upload: UploadFile, dest: str) -> None:
+    """
+    Persist an upload through the content-addressed cache.
+    Repeated uploads of the same bytes are hard-linked from the cached copy
+    instead of being written again.
+    """
+    digest = _UPLOAD_CACHE.digest(upload.file)
+    if _UPLOAD_CACHE.link_cached(digest, dest):
+        return
+    _persist_upload(upload, dest)
+    _UPLOAD_CACHE.add(digest, dest)
+
 
 # ========================
 # REQUEST/RESPONSE MODELS
@@ -106,20 +233,23 @@ class OperationResponse(BaseModel):
 async def edit_pdf(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="PDF file to edit"),
-    operation_type: str = Form(..., description="Type of operation", example="add_text", enum=["add_text", "add_image", "add_annotation"]),
-    page_number: int = Form(..., description="Page number to edit (1-indexed)", example=1, ge=1),
+    operation_type: str = Form(..., description="Type of operation", examples=["add_text"], json_schema_extra={"enum": ["add_text", "add_image", "add_annotation"]}),
+    page_number: int = Form(..., description="Page number to edit (1-indexed)", examples=[1], ge=1),
     # Text editing parameters
-    text: Optional[str] = Form(None, description="Text to add (required for add_text)", example="Hello World"),
-    x: Optional[float] = Form(None, description="X coordinate (required for text/image)", example=100.0),
-    y: Optional[float] = Form(None, description="Y coordinate (required for text/image)", example=200.0),
-    font_size: Optional[int] = Form(12, description="Font size for text", example=14, ge=6, le=72),
-    font_family: Optional[str] = Form("Arial", description="Font family for text", example="Helvetica"),
-    color: Optional[str] = Form("#000000", description="Text color in hex format", example="#FF0000"),
+    text: Optional[str] = Form(None, description="Text to add (required for add_text)", examples=["Hello World"]),
+    x: Optional[float] = Form(None, description="X coordinate (required for text/image)", examples=[100.0]),
+    y: Optional[float] = Form(None, description="Y coordinate (required for text/image)", examples=[200.0]),
+    font_size: Optional[int] = Form(12, description="Font size for text", examples=[14], ge=6, le=72),
+    font_family: Optional[str] = Form("Arial", description="Font family for text", examples=["Helvetica"]),
+    color: Optional[str] = Form("#000000", description="Text color in hex format", examples=["#FF0000"]),
     # Image editing parameters
     image_file: Optional[UploadFile] = File(None, description="Image file to add (required for add_image)"),
-    width: Optional[float] = Form(None, description="Image width in points", example=150.0),
-    height: Optional[float] = Form(None, description="Image height in points", example=100.0),
-    rotation: Optional[float] = Form(0.0, description="Rotation angle in degrees", example=45.0, ge=-360, le=360)
+    width: Optional[float] = Form(None, description="Image width in points", examples=[150.0]),
+    height: Optional[float] = Form(None, description="Image height in points", examples=[100.0]),
+    rotation: Optional[float] = Form(0.0, description="Rotation angle in degrees", examples=[45.0], ge=-360, le=360),
+    # Annotation parameters
+    rects: Optional[str] = Form(None, description="Areas to highlight as one annotation, semicolon-separated x0,y0,x1,y1 (for add_annotation)", examples=["10,10,100,30;10,40,200,60"]),
+    pdf_service=Depends(get_pdf_service)
 ):
     """
     ## Edit PDF Document
@@ -136,8 +266,9 @@ async def edit_pdf(
       - Optional: `width`, `height`, `rotation`
     
     - **add_annotation**: Add highlight, note, or drawing
-      - Required: `x`, `y`
-      - Optional: `width`, `height`, `color`
+      - Required: `x`, `y`, or `rects`
+      - Optional: `width`, `height`
+      - `rects` highlights several areas with a single annotation
     
     ### Coordinate System:
     - Origin (0,0) is at bottom-left corner
@@ -157,76 +288,105 @@ async def edit_pdf(
                 detail="Invalid file type. Only PDF files are allowed."
             )
         
-        logger.info(f"Starting PDF edit operation: {operation_type} on page {page_number}")
+        if (file.size or 0) > settings.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="File too large. Maximum size is 50MB."
+            )
+        
+        logger.info("Starting PDF edit operation: {} on page {}", operation_type, page_number)
         
         # Generate session ID for tracking
         session_id = generate_session_id()
         
         # Save uploaded file temporarily
-        temp_dir = Path(tempfile.gettempdir()) / "pdf_editor" / session_id
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        
+        temp_dir = _SCRATCH_ROOT / session_id
         input_file = temp_dir / sanitize_filename(file.filename)
-        with open(input_file, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        # Prepare operation data
-        operation_data = {
-            "operation_type": operation_type,
-            "page_number": page_number,
-            "session_id": session_id
-        }
+        image_path = None
         
+        # Prepare operation data: one literal per branch, no build-then-update
         if operation_type == "add_text":
-            if not all([text, x is not None, y is not None]):
+            if not text or x is None or y is None:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Missing required text parameters: text, x, y"
                 )
-            operation_data.update({
+            # The service's parser, so both agree on malformed colors (ValueError -> 400);
+            # the module is already loaded by get_pdf_service
+            from app.services.pdf_service import _hex_to_rgb
+            operation_data = {
+                "operation_type": operation_type,
+                "page_number": page_number,
+                "session_id": session_id,
                 "text": text,
                 "x": x,
                 "y": y,
                 "font_size": font_size,
                 "font_family": font_family,
-                "color": color,
+                "color": _hex_to_rgb(color),
                 "rotation": rotation
-            })
+            }
             
         elif operation_type == "add_image":
-            if not image_file or not all([x is not None, y is not None]):
+            if image_file is None or x is None or y is None:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Missing required image parameters: image_file, x, y"
                 )
             
-            # Save image file
             image_path = temp_dir / sanitize_filename(image_file.filename)
-            with open(image_path, "wb") as buffer:
-                image_content = await image_file.read()
-                buffer.write(image_content)
             
-            operation_data.update({
+            operation_data = {
+                "operation_type": operation_type,
+                "page_number": page_number,
+                "session_id": session_id,
                 "image_path": str(image_path),
                 "x": x,
                 "y": y,
                 "width": width,
                 "height": height,
                 "rotation": rotation
-            })
+            }
+            
+        else:
+            operation_data = {
+                "operation_type": operation_type,
+                "page_number": page_number,
+                "session_id": session_id
+            }
+            if rects:
+                operation_data["rects"] = _parse_rects(rects)
+            elif x is None or y is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Missing required annotation parameters: x, y or rects"
+                )
+            else:
+                operation_data.update(x=x, y=y)
+                if width is not None:
+                    operation_data["width"] = width
+                if height is not None:
+                    operation_data["height"] = height
         
-        # Initialize PDF service
-        pdf_service = PDFService()
+        # Persist uploads once parameters are valid; PDF and image copy concurrently.
+        # A PDF small enough to stay in memory is handed over as bytes instead
+        pdf_source = _in_memory_bytes(file)
+        persists = []
+        if pdf_source is None:
+            pdf_source = str(input_file)
+            persists.append(run_in_threadpool(_persist_upload, file, input_file))
+        if image_path is not None:
+            persists.append(run_in_threadpool(_persist_upload, image_file, image_path))
+        await asyncio.gather(*persists)
         
         # Process PDF editing
         result = await pdf_service.edit_pdf(
-            input_file=str(input_file),
+            input_file=pdf_source,
             operation_data=operation_data
         )
         
         if result["success"]:
-            return OperationResponse(
+            return OperationResponse.model_construct(
                 success=True,
                 message=f"PDF {operation_type} completed successfully",
                 file_id=result["file_id"],
@@ -240,8 +400,150 @@ async def edit_pdf(
                 detail=result.get("error", "PDF editing failed")
             )
             
+    except HTTPException:
+        raise
+    except OSError as e:
+        logger.error("PDF edit storage error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail=f"PDF editing failed: {str(e)}"
+        )
+    except ValueError as e:
+        logger.error("PDF edit parameter error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF editing failed: {str(e)}"
+        )
     except Exception as e:
-        logger.error(f"PDF edit error: {str(e)}")
+        logger.error("PDF edit error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"PDF editing failed: {str(e)}"
+        )
+
+async def _read_pdf_body(request: Request) -> bytes:
+    """Read a raw PDF request body into memory, enforcing the per-file size limit"""
+    chunks = []
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > settings.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="File too large. Maximum size is 50MB."
+            )
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+@router.post(
+    "/edit-stream",
+    response_class=Response,
+    summary="Edit PDF Document In Memory",
+    description="Add text or an annotation to a PDF sent as the raw request body and receive the edited PDF directly",
+    responses={
+        200: {
+            "description": "Edited PDF document",
+            "content": {"application/pdf": {}}
+        },
+        400: {"description": "Empty body or missing parameters"},
+        413: {"description": "File too large"},
+        500: {"description": "PDF editing failed"}
+    },
+    tags=["PDF Operations"]
+)
+async def edit_pdf_stream(
+    request: Request,
+    operation_type: str = Query(..., description="Type of operation", examples=["add_text"], json_schema_extra={"enum": ["add_text", "add_annotation"]}),
+    page_number: int = Query(..., description="Page number to edit (1-indexed)", examples=[1], ge=1),
+    text: Optional[str] = Query(None, description="Text to add (required for add_text)", examples=["Hello World"]),
+    x: Optional[float] = Query(None, description="X coordinate", examples=[100.0]),
+    y: Optional[float] = Query(None, description="Y coordinate", examples=[200.0]),
+    font_size: Optional[int] = Query(12, description="Font size for text", examples=[14], ge=6, le=72),
+    font_family: Optional[str] = Query("Arial", description="Font family for text", examples=["Helvetica"]),
+    color: Optional[str] = Query(None, description="Color in hex format (text defaults to black, annotations to yellow)", examples=["#FF0000"]),
+    width: Optional[float] = Query(None, description="Annotation width in points", examples=[150.0]),
+    height: Optional[float] = Query(None, description="Annotation height in points", examples=[20.0]),
+    rotation: Optional[float] = Query(0.0, description="Rotation angle in degrees", examples=[45.0], ge=-360, le=360),
+    rects: Optional[str] = Query(None, description="Areas to highlight as one annotation, semicolon-separated x0,y0,x1,y1", examples=["10,10,100,30;10,40,200,60"]),
+    pdf_service=Depends(get_pdf_service)
+):
+    """
+    ## Edit PDF Document In Memory
+    
+    Same operations as `/edit` (except `add_image`), but the PDF is sent as the raw
+    request body (`Content-Type: application/pdf`) and the edited PDF is returned in
+    the response. Nothing is written to disk, so there is no file ID or download step.
+    
+    ```bash
+    curl -X POST "http://localhost:8000/api/v1/pdf/edit-stream?operation_type=add_text&page_number=1&text=Hello&x=100&y=200" \\
+         -H "Content-Type: application/pdf" --data-binary @document.pdf -o edited.pdf
+    ```
+    """
+    
+    try:
+        has_rects = operation_type == "add_annotation" and bool(rects)
+        if not has_rects and (x is None or y is None or (operation_type == "add_text" and not text)):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Missing required parameters: x, y (and text for add_text) or rects"
+            )
+        
+        if operation_type == "add_text":
+            from app.services.pdf_service import _hex_to_rgb  # ValueError on a malformed color -> 400
+            operation_data = {
+                "operation_type": operation_type,
+                "page_number": page_number,
+                "text": text,
+                "x": x,
+                "y": y,
+                "font_size": font_size,
+                "font_family": font_family,
+                "color": _hex_to_rgb(color or "#000000"),
+                "rotation": rotation
+            }
+        elif operation_type == "add_annotation":
+            operation_data = {
+                "operation_type": operation_type,
+                "page_number": page_number,
+                "color": color or "#FFFF00"
+            }
+            if has_rects:
+                operation_data["rects"] = _parse_rects(rects)
+            else:
+                operation_data.update(x=x, y=y)
+                if width is not None:
+                    operation_data["width"] = width
+                if height is not None:
+                    operation_data["height"] = height
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unsupported operation: {operation_type}"
+            )
+        
+        data = await _read_pdf_body(request)
+        if not data:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Request body must contain a PDF document"
+            )
+        
+        logger.info("Starting in-memory PDF edit operation: {} on page {}", operation_type, page_number)
+        output = await pdf_service.edit_pdf_bytes(data, operation_data)
+        
+        return Response(content=output, media_type="application/pdf")
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        logger.error("PDF edit parameter error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF editing failed: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("PDF edit error: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"PDF editing failed: {str(e)}"
@@ -284,10 +586,11 @@ async def edit_pdf(
 async def split_pdf(
     background_tasks: BackgroundTasks,
     file: UploadFile = File(..., description="PDF file to split"),
-    split_type: str = Form(..., description="Method to split the PDF", example="pages", enum=["pages", "range", "bookmark", "size"]),
-    pages: Optional[str] = Form(None, description="Comma-separated page numbers (for 'pages' type)", example="1,3,5"),
-    page_ranges: Optional[str] = Form(None, description="Comma-separated page ranges (for 'range' type)", example="1-5,8-10"),
-    max_pages_per_file: Optional[int] = Form(None, description="Maximum pages per output file (for 'size' type)", example=10, ge=1)
+    split_type: str = Form(..., description="Method to split the PDF", examples=["pages"], json_schema_extra={"enum": ["pages", "range", "bookmark", "size"]}),
+    pages: Optional[str] = Form(None, description="Comma-separated page numbers (for 'pages' type)", examples=["1,3,5"]),
+    page_ranges: Optional[str] = Form(None, description="Comma-separated page ranges (for 'range' type)", examples=["1-5,8-10"]),
+    max_pages_per_file: Optional[int] = Form(None, description="Maximum pages per output file (for 'size' type)", examples=[10], ge=1),
+    pdf_service=Depends(get_pdf_service)
 ):
     """
     ## Split PDF Document
@@ -299,7 +602,7 @@ async def split_pdf(
     #### 1. **pages** - Extract specific pages
     - Parameter: `pages` (comma-separated page numbers)
     - Example: `pages="1,3,5"` extracts pages 1, 3, and 5
-    - Output: Separate PDF file for each specified page
+    - Output: One PDF file per run of consecutive pages (`pages="1,2,3,7"` gives `pages_1-3.pdf` and `page_7.pdf`)
     
     #### 2. **range** - Extract page ranges
     - Parameter: `page_ranges` (comma-separated ranges)
@@ -333,19 +636,17 @@ async def split_pdf(
                 detail="Invalid file type. Only PDF files are allowed."
             )
         
-        logger.info(f"Starting PDF split operation: {split_type}")
+        logger.info("Starting PDF split operation: {}", split_type)
         
         # Generate session ID
         session_id = generate_session_id()
         
-        # Save uploaded file
-        temp_dir = Path(tempfile.gettempdir()) / "pdf_editor" / session_id
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        
-        input_file = temp_dir / sanitize_filename(file.filename)
-        with open(input_file, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # Save uploaded file, unless it is small enough to pass along as bytes
+        pdf_source = _in_memory_bytes(file)
+        if pdf_source is None:
+            input_file = _SCRATCH_ROOT / session_id / sanitize_filename(file.filename)
+            await run_in_threadpool(_persist_upload, file, input_file)
+            pdf_source = str(input_file)
         
         # Parse split parameters
         split_config = {
@@ -354,23 +655,20 @@ async def split_pdf(
         }
         
         if split_type == "pages" and pages:
-            split_config["pages"] = [int(p.strip()) for p in pages.split(",")]
+            split_config["pages"] = [int(p) for p in _PAGE_RE.findall(pages)]
         elif split_type == "range" and page_ranges:
-            split_config["page_ranges"] = [r.strip() for r in page_ranges.split(",")]
+            split_config["page_ranges"] = [(int(start), int(end)) for start, end in _RANGE_RE.findall(page_ranges)]
         elif split_type == "size" and max_pages_per_file:
             split_config["max_pages_per_file"] = max_pages_per_file
         
-        # Initialize PDF service
-        pdf_service = PDFService()
-        
         # Process PDF splitting
         result = await pdf_service.split_pdf(
-            input_file=str(input_file),
+            input_file=pdf_source,
             split_config=split_config
         )
         
         if result["success"]:
-            return OperationResponse(
+            return OperationResponse.model_construct(
                 success=True,
                 message=f"PDF split into {result['file_count']} files",
                 file_id=result["file_id"],
@@ -388,8 +686,22 @@ async def split_pdf(
                 detail=result.get("error", "PDF splitting failed")
             )
             
+    except HTTPException:
+        raise
+    except OSError as e:
+        logger.error("PDF split storage error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail=f"PDF splitting failed: {str(e)}"
+        )
+    except ValueError as e:
+        logger.error("PDF split parameter error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF splitting failed: {str(e)}"
+        )
     except Exception as e:
-        logger.error(f"PDF split error: {str(e)}")
+        logger.error("PDF split error: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"PDF splitting failed: {str(e)}"
@@ -399,6 +711,89 @@ async def split_pdf(
 # PDF MERGE ENDPOINT
 # ========================
 
+async def _prepare_merge(
+    files: List[UploadFile],
+    merge_order: Optional[str],
+    bookmark_structure: bool,
+    page_numbering: bool
+) -> tuple:
+    """Validate merge uploads, persist them, and return the ordered input paths and merge config"""
+    # Validate files
+    if len(files) < 2:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least 2 PDF files are required for merging"
+        )
+    
+    # Parse merge order
+    order_indices = None
+    if merge_order:
+        # Bound the field before splitting so an oversized string is rejected cheaply
+        if len(merge_order) > _MAX_MERGE_ORDER_LEN:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Merge order is too long"
+            )
+        order_indices = [int(idx) for idx in merge_order.split(",")]
+        # Must be a permutation of the upload indices: no gaps, repeats or negatives
+        if len(order_indices) != len(files) or set(order_indices) != set(range(len(files))):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Merge order must specify all files"
+            )
+    
+    # Generate session ID
+    session_id = generate_session_id()
+    temp_dir = _SCRATCH_ROOT / session_id
+    
+    # Validate and name every upload in one pass; nothing touches the disk
+    # until the whole request has been accepted. Paths are plain strings
+    # built from one prefix, so no PurePath is parsed per file
+    temp_prefix = f"{temp_dir}{os.sep}"
+    input_files = []
+    # Content-Length is already capped by middleware; the running total over the
+    # parsed parts catches chunked bodies and headers that understate the size
+    total_size = 0
+    for i, file in enumerate(files):
+        filename = file.filename
+        if not validate_file_extension(filename):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid file type: {filename}. Only PDF files are allowed."
+            )
+        size = file.size or 0
+        total_size += size
+        if size > settings.MAX_FILE_SIZE or total_size > settings.MAX_REQUEST_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File too large: {filename}" if size > settings.MAX_FILE_SIZE else "Total merge size exceeds 500MB"
+            )
+        input_files.append(f"{temp_prefix}{i}_{sanitize_filename(filename)}")
+    
+    logger.info("Starting PDF merge operation with {} files", len(files))
+    
+    # Save uploaded files; the scratch root already exists
+    temp_dir.mkdir(exist_ok=True)
+    
+    # Persist all uploads concurrently rather than one after another
+    await asyncio.gather(*(
+        run_in_threadpool(_persist_cached_upload, file, file_path)
+        for file, file_path in zip(files, input_files)
+    ))
+    
+    if order_indices is not None:
+        # Reorder files according to specified order
+        input_files = [input_files[i] for i in order_indices]
+    
+    merge_config = {
+        "session_id": session_id,
+        "bookmark_structure": bookmark_structure,
+        "page_numbering": page_numbering,
+        "file_count": len(files)
+    }
+    
+    return input_files, merge_config
+
 @router.post(
     "/merge", 
     response_model=OperationResponse,
@@ -426,6 +821,7 @@ async def split_pdf(
             }
         },
         400: {"description": "Invalid files or insufficient files for merging"},
+        413: {"description": "File or total merge size too large"},
         500: {"description": "PDF merging failed"}
     },
     tags=["PDF Operations"]
@@ -433,9 +829,10 @@ async def split_pdf(
 async def merge_pdfs(
     background_tasks: BackgroundTasks,
     files: List[UploadFile] = File(..., description="List of PDF files to merge (minimum 2 files)"),
-    merge_order: Optional[str] = Form(None, description="Custom order for merging files (comma-separated indices)", example="0,2,1"),
+    merge_order: Optional[str] = Form(None, description="Custom order for merging files (comma-separated indices)", examples=["0,2,1"]),
     bookmark_structure: bool = Form(True, description="Preserve and organize bookmark structure"),
-    page_numbering: bool = Form(True, description="Add page numbers to the merged document")
+    page_numbering: bool = Form(True, description="Add page numbers to the merged document"),
+    pdf_service=Depends(get_pdf_service)
 ):
     """
     ## Merge PDF Documents
@@ -476,57 +873,9 @@ async def merge_pdfs(
     """
     
     try:
-        # Validate files
-        if len(files) < 2:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="At least 2 PDF files are required for merging"
-            )
-        
-        for file in files:
-            if not validate_file_extension(file.filename):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid file type: {file.filename}. Only PDF files are allowed."
-                )
-        
-        logger.info(f"Starting PDF merge operation with {len(files)} files")
-        
-        # Generate session ID
-        session_id = generate_session_id()
-        
-        # Save uploaded files
-        temp_dir = Path(tempfile.gettempdir()) / "pdf_editor" / session_id
-        temp_dir.mkdir(parents=True, exist_ok=True)
-        
-        input_files = []
-        for i, file in enumerate(files):
-            file_path = temp_dir / f"{i}_{sanitize_filename(file.filename)}"
-            with open(file_path, "wb") as buffer:
-                content = await file.read()
-                buffer.write(content)
-            input_files.append(str(file_path))
-        
-        # Parse merge order
-        if merge_order:
-            order_indices = [int(idx.strip()) for idx in merge_order.split(",")]
-            if len(order_indices) != len(files):
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Merge order must specify all files"
-                )
-            # Reorder files according to specified order
-            input_files = [input_files[i] for i in order_indices]
-        
-        merge_config = {
-            "session_id": session_id,
-            "bookmark_structure": bookmark_structure,
-            "page_numbering": page_numbering,
-            "file_count": len(files)
-        }
-        
-        # Initialize PDF service
-        pdf_service = PDFService()
+        input_files, merge_config = await _prepare_merge(
+            files, merge_order, bookmark_structure, page_numbering
+        )
         
         # Process PDF merging
         result = await pdf_service.merge_pdfs(
@@ -535,7 +884,7 @@ async def merge_pdfs(
         )
         
         if result["success"]:
-            return OperationResponse(
+            return OperationResponse.model_construct(
                 success=True,
                 message=f"Successfully merged {len(files)} PDF files",
                 file_id=result["file_id"],
@@ -554,8 +903,109 @@ async def merge_pdfs(
                 detail=result.get("error", "PDF merging failed")
             )
             
+    except HTTPException:
+        raise
+    except OSError as e:
+        logger.error("PDF merge storage error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail=f"PDF merging failed: {str(e)}"
+        )
+    except ValueError as e:
+        logger.error("PDF merge parameter error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF merging failed: {str(e)}"
+        )
     except Exception as e:
-        logger.error(f"PDF merge error: {str(e)}")
+        logger.error("PDF merge error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"PDF merging failed: {str(e)}"
+        )
+
+@router.post(
+    "/merge/stream",
+    response_class=StreamingResponse,
+    summary="Merge PDF Documents (Streamed)",
+    description="Combine multiple PDF files and return the merged document in the same response",
+    responses={
+        200: {
+            "description": "Merged PDF document",
+            "content": {"application/pdf": {}}
+        },
+        400: {"description": "Invalid files or insufficient files for merging"},
+        413: {"description": "File or total merge size too large"},
+        500: {"description": "PDF merging failed"}
+    },
+    tags=["PDF Operations"]
+)
+async def merge_pdfs_stream(
+    files: List[UploadFile] = File(..., description="List of PDF files to merge (minimum 2 files)"),
+    merge_order: Optional[str] = Form(None, description="Custom order for merging files (comma-separated indices)", examples=["0,2,1"]),
+    bookmark_structure: bool = Form(True, description="Preserve and organize bookmark structure"),
+    page_numbering: bool = Form(True, description="Add page numbers to the merged document"),
+    pdf_service=Depends(get_pdf_service)
+):
+    """
+    ## Merge PDF Documents (Streamed)
+    
+    Same options as `/merge`, but the merged PDF is streamed back in the
+    response body instead of being fetched later from `/download/{file_id}`.
+    
+    ### Response:
+    - Content-Type: `application/pdf`
+    - Content-Disposition: `attachment; filename="merged_{file_id}.pdf"`
+    - `X-File-Id` header with the file ID, so the result can still be downloaded again
+    
+    ### Notes:
+    - Saves the download round trip for clients that want the file straight away
+    - The body is sent in 1MB chunks, so server memory stays flat for large merges
+    """
+    try:
+        input_files, merge_config = await _prepare_merge(
+            files, merge_order, bookmark_structure, page_numbering
+        )
+        
+        result = await pdf_service.merge_pdfs(
+            input_files=input_files,
+            merge_config=merge_config
+        )
+        if not result["success"]:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=result.get("error", "PDF merging failed")
+            )
+        
+        # The merge has finished before headers go out, so failures above
+        # still surface as proper HTTP errors
+        file_id = result["file_id"]
+        return StreamingResponse(
+            pdf_service.stream_file(result["output_file"]),
+            media_type="application/pdf",
+            headers={
+                "Content-Disposition": f'attachment; filename="merged_{file_id}.pdf"',
+                "Content-Length": str(result["metadata"]["file_size"]),
+                "X-File-Id": file_id
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except OSError as e:
+        logger.error("PDF merge storage error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_507_INSUFFICIENT_STORAGE,
+            detail=f"PDF merging failed: {str(e)}"
+        )
+    except ValueError as e:
+        logger.error("PDF merge parameter error: {}", e)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"PDF merging failed: {str(e)}"
+        )
+    except Exception as e:
+        logger.error("PDF merge error: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"PDF merging failed: {str(e)}"
@@ -586,7 +1036,8 @@ async def merge_pdfs(
     tags=["Utility Operations"]
 )
 async def download_file(
-    file_id: str = Path(..., description="Unique file identifier from processing operation", example="abc123def456")
+    file_id: str = Path(..., description="Unique file identifier from processing operation", examples=["abc123def456"]),
+    pdf_service=Depends(get_pdf_service)
 ):
     """
     ## Download Processed File
@@ -614,28 +1065,43 @@ async def download_file(
     """
     try:
         # Implement file download logic
-        pdf_service = PDFService()
         file_path = await pdf_service.get_file_path(file_id)
         
-        if not file_path or not os.path.exists(file_path):
+        # One stat serves as both the existence check and FileResponse's metadata
+        try:
+            stat_result = os.stat(file_path) if file_path else None
+        except FileNotFoundError:
+            stat_result = None
+        if stat_result is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found"
             )
         
+        # FileResponse streams via sendfile(2) when the server supports it
         return FileResponse(
             path=file_path,
             media_type="application/pdf",
-            filename=f"processed_{file_id}.pdf"
+            filename=f"processed_{file_id}.pdf",
+            stat_result=stat_result
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"File download error: {str(e)}")
+        logger.error("File download error: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="File download failed"
         )
 
+# Clients poll status every second or two; repeat polls within the TTL are
+# answered from memory instead of rescanning the session directory
+_STATUS_CACHE_TTL = 0.5
+_STATUS_CACHE_SWEEP_INTERVAL = 60.0
+_status_cache: Dict[str, tuple] = {}
+_status_cache_swept_at = 0.0
+
 @router.get(
     "/status/{file_id}",
     summary="Check Processing Status",
@@ -662,7 +1128,8 @@ async def download_file(
     tags=["Utility Operations"]
 )
 async def get_processing_status(
-    file_id: str = Path(..., description="Unique file identifier from processing operation", example="abc123def456")
+    file_id: str = Path(..., description="Unique file identifier from processing operation", examples=["abc123def456"]),
+    pdf_service=Depends(get_pdf_service)
 ):
     """
     ## Check Processing Status
@@ -697,10 +1164,15 @@ async def get_processing_status(
     - Stop polling when status is 'completed' or 'failed'
     """
     try:
-        pdf_service = PDFService()
+        global _status_cache_swept_at
+        now = time.monotonic()
+        cached = _status_cache.get(file_id)
+        if cached is not None and now - cached[0] < _STATUS_CACHE_TTL:
+            return cached[1]
+        
         status_info = await pdf_service.get_processing_status(file_id)
         
-        return {
+        body = {
             "file_id": file_id,
             "status": status_info.get("status", "unknown"),
             "progress": status_info.get("progress", 0),
@@ -708,9 +1180,20 @@ async def get_processing_status(
             "created_at": status_info.get("created_at"),
             "completed_at": status_info.get("completed_at")
         }
+        _status_cache[file_id] = (now, body)
+        
+        # Drop expired entries now and then so ids that stop being polled don't pile up
+        if now - _status_cache_swept_at > _STATUS_CACHE_SWEEP_INTERVAL:
+            _status_cache_swept_at = now
+            for key in [key for key, (ts, _) in _status_cache.items() if now - ts >= _STATUS_CACHE_TTL]:
+                del _status_cache[key]
+        
+        return body
         
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Status check error: {str(e)}")
+        logger.error("Status check error: {}", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Status check failed"
@@ -6,28 +6,36 @@ from fastapi import APIRouter, UploadFile, File, HTTPException, status, Path
 from fastapi.responses import JSONResponse
 from typing import List
 from pydantic import BaseModel, Field
+import asyncio
 import os
-import shutil
 from pathlib import Path as PathLib
-import uuid
 
+from app.core.buffer_pool import copy_upload
 from app.core.simple_logger import logger
-from app.core.simple_security import validate_file_extension, sanitize_filename
+from app.core.simple_security import generate_file_id, validate_file_extension, sanitize_filename
 from app.core.simple_config import settings
 
 router = APIRouter()
 
+def _save_sync(src, dest: PathLib) -> int:
+    """Copy an upload to disk with a fixed-size buffer, returning bytes written"""
+    fd = os.open(dest, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_CLOEXEC, 0o600)
+    try:
+        return copy_upload(src, fd)
+    finally:
+        os.close(fd)
+
 class FileInfo(BaseModel):
     """File information response model"""
-    filename: str = Field(..., description="Sanitized filename", example="document.pdf")
-    size: int = Field(..., description="File size in bytes", example=1048576)
-    mime_type: str = Field(..., description="MIME type of the file", example="application/pdf")
-    file_id: str = Field(..., description="Unique file identifier", example="file_0")
+    filename: str = Field(..., description="Sanitized filename", json_schema_extra={"example": "document.pdf"})
+    size: int = Field(..., description="File size in bytes", json_schema_extra={"example": 1048576})
+    mime_type: str = Field(..., description="MIME type of the file", json_schema_extra={"example": "application/pdf"})
+    file_id: str = Field(..., description="Unique file identifier", json_schema_extra={"example": "file_0"})
 
 class UploadResponse(BaseModel):
     """File upload response model"""
-    success: bool = Field(..., description="Upload operation success status", example=True)
-    message: str = Field(..., description="Upload operation message", example="Successfully uploaded 1 file")
+    success: bool = Field(..., description="Upload operation success status", json_schema_extra={"example": True})
+    message: str = Field(..., description="Upload operation message", json_schema_extra={"example": "Successfully uploaded 1 file"})
     files: List[FileInfo] = Field(..., description="List of uploaded file information")
 
 @router.post("/upload", response_model=UploadResponse)
@@ -47,16 +55,12 @@ async def upload_files(
                 )
             
             # Generate unique file ID and sanitize filename
-            file_id = str(uuid.uuid4())
+            file_id = generate_file_id()
             sanitized_filename = sanitize_filename(file.filename)
             file_path = upload_dir / f"{file_id}_{sanitized_filename}"
             
-            # Save file
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            # Get file size
-            file_size = file_path.stat().st_size
+            # Stream file to disk in a worker thread so the event loop stays free
+            file_size = await asyncio.to_thread(_save_sync, file.file, file_path)
             
             file_info = FileInfo(
                 filename=sanitized_filename,
@@ -66,7 +70,7 @@ async def upload_files(
             )
             uploaded_files.append(file_info)
             
-            logger.info(f"Uploaded file: {sanitized_filename} with ID: {file_id}")
+            logger.info("Uploaded file: %s with ID: %s", sanitized_filename, file_id)
         
         return UploadResponse(
             success=True,
@@ -75,7 +79,7 @@ async def upload_files(
         )
         
     except Exception as e:
-        logger.error(f"File upload error: {str(e)}")
+        logger.error("File upload error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="File upload failed"
@@ -95,7 +99,7 @@ async def validate_file(filename: str = Path(..., description="Filename to valid
         }
         
     except Exception as e:
-        logger.error(f"File validation error: {str(e)}")
+        logger.error("File validation error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="File validation failed"
@@ -0,0 +1,70 @@
+"""
+Reusable buffer pool and copy helpers for upload copies
+Chunks are read into pooled bytearrays instead of allocating a new bytes object per read
+"""
+
+import io
+import os
+import queue
+from contextlib import contextmanager
+from typing import Iterator
+
+BUFFER_SIZE = 1 << 20  # 1 MiB, matches the upload chunk size
+MAX_POOLED_BUFFERS = 32
+
+# Thread-safe: uploads are copied from threadpool workers, not the event loop
+_pool: "queue.SimpleQueue[bytearray]" = queue.SimpleQueue()
+
+def acquire() -> bytearray:
+    """Take a buffer from the pool, allocating a new one if the pool is empty"""
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        return bytearray(BUFFER_SIZE)
+
+def release(buf: bytearray) -> None:
+    """Return a buffer to the pool; surplus buffers are left to the GC"""
+    if _pool.qsize() < MAX_POOLED_BUFFERS:
+        _pool.put(buf)
+
+@contextmanager
+def pooled_buffer() -> Iterator[bytearray]:
+    """Borrow a buffer for the duration of a ``with`` block"""
+    buf = acquire()
+    try:
+        yield buf
+    finally:
+        release(buf)
+
+def copy_to_fd(src, fd: int) -> int:
+    """Copy ``src`` into a raw file descriptor with os.write, returning bytes copied"""
+    # Writing straight to the fd skips the BufferedWriter layer, which only
+    # adds a copy and a flush check for chunks this large
+    size = 0
+    with pooled_buffer() as buf:
+        view = memoryview(buf)
+        while n := src.readinto(buf):
+            written = 0
+            while written < n:
+                written += os.write(fd, view[written:n])
+            size += n
+    return size
+
+def sendfile_copy(src_fd: int, dst_fd: int) -> int:
+    """Copy one file descriptor into another inside the kernel, returning bytes copied"""
+    offset = 0
+    while sent := os.sendfile(dst_fd, src_fd, offset, BUFFER_SIZE):
+        offset += sent
+    return offset
+
+def copy_upload(src, fd: int) -> int:
+    """Copy an upload's spooled file into an open file descriptor, returning bytes copied"""
+    # Uploads spooled to disk are copied with sendfile(2), skipping userspace
+    if getattr(src, "_rolled", True) and hasattr(os, "sendfile"):
+        try:
+            return sendfile_copy(src.fileno(), fd)
+        except (OSError, io.UnsupportedOperation):
+            src.seek(0)
+            os.ftruncate(fd, 0)
+            os.lseek(fd, 0, os.SEEK_SET)
+    return copy_to_fd(src, fd)
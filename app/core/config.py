@@ -6,6 +6,7 @@ from typing import List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import validator
 import os
+import tempfile
 from pathlib import Path
 
 class Settings(BaseSettings):
@@ -27,6 +28,15 @@ class Settings(BaseSettings):
     # File Upload Configuration
     UPLOAD_DIR: str = "./uploads"
     MAX_UPLOAD_SIZE: int = 104857600  # 100MB
+    MAX_FILE_SIZE: int = 52428800  # 50MB per uploaded file
+    MAX_REQUEST_SIZE: int = 524288000  # 500MB per request
+    MAX_FILES_PER_REQUEST: int = 10
+    UPLOAD_CACHE_SIZE: int = 1073741824  # 1GB of deduplicated merge inputs
+    THREAD_POOL_SIZE: int = 64  # Worker threads for blocking upload and PDF I/O
+    PDF_WORKERS: int = 4  # Processes for CPU-bound PDF work (split outputs)
+    # Scratch storage for uploads and outputs; point at /dev/shm to keep it in RAM
+    PDF_PRODIGY_TEMP: str = tempfile.gettempdir()
+    SESSION_TTL_MINUTES: int = 1440  # Session directories older than this are removed
     ALLOWED_EXTENSIONS: List[str] = ["pdf", "png", "jpg", "jpeg", "docx", "pptx", "xlsx"]
     
     # CORS Configuration
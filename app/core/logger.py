@@ -15,8 +15,11 @@ logger.add(
     format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
     level=settings.LOG_LEVEL,
     colorize=True,
-    backtrace=True,
-    diagnose=True,
+    # Frame capture and variable dumps are costly; keep them for local debugging
+    backtrace=settings.DEBUG,
+    diagnose=settings.DEBUG,
+    # Records go through a queue to a writer thread, so logging never blocks a request
+    enqueue=True,
 )
 
 # Add file logger for production
@@ -28,6 +31,7 @@ if not settings.DEBUG:
         level="INFO",
         format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
         compression="zip",
+        enqueue=True,
     )
 
 # Export logger instance
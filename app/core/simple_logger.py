@@ -2,15 +2,29 @@
 Simplified logger for basic integration
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 
+# Request handlers only enqueue records; a listener thread does the stdout writes
+_log_queue = queue.SimpleQueue()
+_stream_handler = logging.StreamHandler(sys.stdout)
+_stream_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+_listener = logging.handlers.QueueListener(_log_queue, _stream_handler)
+_listener.start()
+atexit.register(_listener.stop)
+
+# The queue handler only merges args into the message; the listener's handler formats
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+
 # Configure basic logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.StreamHandler(sys.stdout)
+        _queue_handler
     ]
 )
 
@@ -2,31 +2,56 @@
 Simplified security functions for basic integration
 """
 
+import itertools
 import os
 import re
-from pathlib import Path
+import secrets
+import time
+
+# Characters outside [\w\-.] are replaced with '_'. ASCII names go through a
+# translate table; re is only needed for non-ASCII names, where \w is Unicode-aware
+_UNSAFE_CHARS = re.compile(r'[^\w\-_\.]')
+_ASCII_SAFE = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.')
+_ASCII_TRANS = str.maketrans({chr(c): '_' for c in range(128) if chr(c) not in _ASCII_SAFE})
 
 def validate_file_extension(filename: str) -> bool:
     """Validate if file has a supported extension"""
-    if not filename:
-        return False
-    
-    extension = Path(filename).suffix.lower()
-    return extension == '.pdf'
+    # Tail compare; a bare ".pdf" has no stem and is rejected as before
+    return bool(filename) and len(filename) > 4 and filename[-4:].lower() == '.pdf'
 
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage"""
     if not filename:
         return "unnamed_file.pdf"
     
-    # Remove directory path
-    filename = os.path.basename(filename)
+    # Remove directory path (either separator, as clients may send Windows paths)
+    filename = filename.rsplit('/', 1)[-1].rsplit('\\', 1)[-1]
     
     # Replace unsafe characters
-    filename = re.sub(r'[^\w\-_\.]', '_', filename)
+    if filename.isascii():
+        filename = filename.translate(_ASCII_TRANS)
+    else:
+        filename = _UNSAFE_CHARS.sub('_', filename)
     
     # Ensure it has a valid extension
     if not filename.endswith('.pdf'):
         filename += '.pdf'
     
     return filename
+
+# File IDs are a random per-process prefix plus a monotonic clock and counter,
+# so only process start (and fork) touches the OS random source
+_id_prefix = secrets.token_hex(6)
+_id_counter = itertools.count()
+
+def _reseed_file_ids() -> None:
+    global _id_prefix, _id_counter
+    _id_prefix = secrets.token_hex(6)
+    _id_counter = itertools.count()
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_file_ids)
+
+def generate_file_id() -> str:
+    """Generate a unique file ID without a urandom call per ID"""
+    return f"{_id_prefix}{time.monotonic_ns():x}{next(_id_counter):x}"
@@ -0,0 +1,109 @@
+"""
+Content-addressed cache for uploaded files
+Byte-identical uploads are hard-linked from a cached copy instead of being written again
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Union
+
+from app.core.buffer_pool import pooled_buffer
+
+class UploadCache:
+    """LRU index of upload digests to cached files, bounded by total size in bytes"""
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        # Must share a filesystem with the session directories so hard links work
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._index()
+
+    @staticmethod
+    def digest(src) -> str:
+        """BLAKE2b digest of a file object's contents; the file is rewound afterwards"""
+        hasher = hashlib.blake2b(digest_size=16)
+        with pooled_buffer() as buf:
+            view = memoryview(buf)
+            while n := src.readinto(buf):
+                hasher.update(view[:n])
+        src.seek(0)
+        return hasher.hexdigest()
+
+    def link_cached(self, digest: str, dest: Union[str, Path]) -> bool:
+        """Hard-link the cached copy for ``digest`` to ``dest``; False on a cache miss"""
+        with self._lock:
+            if digest not in self._entries:
+                return False
+            self._entries.move_to_end(digest)
+        cached = self.cache_dir / digest
+        try:
+            # Recency lives in the mtime so it survives restarts (see _index)
+            os.utime(cached)
+            os.link(cached, dest)
+            return True
+        except FileNotFoundError:
+            # Evicted by another worker sharing the cache directory
+            self._forget(digest)
+            return False
+
+    def add(self, digest: str, path: Union[str, Path]) -> None:
+        """Record a freshly written upload under its digest, evicting old entries if needed"""
+        size = os.stat(path).st_size
+        cached = self.cache_dir / digest
+        try:
+            os.link(path, cached)
+        except FileExistsError:
+            # Already cached (e.g. by another worker); refresh its recency instead
+            try:
+                os.utime(cached)
+            except FileNotFoundError:
+                os.link(path, cached)
+
+        self._record(digest, size)
+
+    def _index(self) -> None:
+        """Load the entries already on disk, least recently used first, and trim to size"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False):
+                    st = entry.stat(follow_symlinks=False)
+                    entries.append((st.st_mtime, entry.name, st.st_size))
+        entries.sort()
+        with self._lock:
+            for _, digest, size in entries:
+                self._entries[digest] = size
+                self._total_bytes += size
+        self._record(None, 0)
+
+    def _record(self, digest: Optional[str], size: int) -> None:
+        """Account for a cached file (if any) as most recent, then evict entries over the bound"""
+        evicted = []
+        with self._lock:
+            if digest is not None:
+                self._total_bytes += size - self._entries.pop(digest, 0)
+                self._entries[digest] = size
+            while self._total_bytes > self.max_bytes and self._entries:
+                old_digest, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evicted.append(old_digest)
+
+        # Session directories keep their own links, so unlinking here is safe
+        for old_digest in evicted:
+            try:
+                os.unlink(self.cache_dir / old_digest)
+            except FileNotFoundError:
+                pass
+
+    def _forget(self, digest: str) -> None:
+        with self._lock:
+            size = self._entries.pop(digest, None)
+            if size is not None:
+                self._total_bytes -= size
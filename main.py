@@ -8,12 +8,17 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
+import anyio.to_thread
+import asyncio
+import os
 import uvicorn
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from app.core.config import settings
 from app.core.logger import logger
 from app.api.v1.api import api_router
+from app.api.v1.endpoints.pdf_operations_controller import get_pdf_service
 from app.db.session import engine
 from app.db.base import Base
 
@@ -134,14 +139,26 @@ app.add_middleware(
     allowed_hosts=settings.ALLOWED_HOSTS,
 )
 
+# Reject oversized request bodies from Content-Length before any byte is read
+@app.middleware("http")
+async def limit_request_size(request: Request, call_next):
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.MAX_REQUEST_SIZE:
+        return JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={"detail": "Request body too large"}
+        )
+    return await call_next(request)
+
 # Request timing middleware
 @app.middleware("http")
 async def add_process_time_header(request: Request, call_next):
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
     response = await call_next(request)
-    process_time = time.time() - start_time
-    response.headers["X-Process-Time"] = str(process_time)
-    logger.info(f"{request.method} {request.url.path} - {response.status_code} - {process_time:.4f}s")
+    process_time = (time.perf_counter_ns() - start_ns) / 1e9
+    response.headers["X-Process-Time"] = f"{process_time:.4f}"
+    # Arguments rather than an f-string: loguru only formats when INFO is enabled
+    logger.info("{} {} - {} - {:.4f}s", request.method, request.url.path, response.status_code, process_time)
     return response
 
 # Exception handler
@@ -179,10 +196,42 @@ async def root():
         "health": "/health"
     }
 
+# Session directories hold uploads and outputs; sweep expired ones so scratch
+# storage (possibly RAM-backed tmpfs) stays bounded
+SESSION_CLEANUP_INTERVAL = 600  # seconds
+
+async def cleanup_sessions_periodically():
+    pdf_service = get_pdf_service()
+    while True:
+        await asyncio.sleep(SESSION_CLEANUP_INTERVAL)
+        try:
+            removed = await asyncio.to_thread(
+                pdf_service.cleanup_expired_sessions,
+                settings.SESSION_TTL_MINUTES * 60,
+                frozenset({"upload_cache"})
+            )
+            if removed:
+                logger.info("Removed {} expired session directories", removed)
+        except Exception as e:
+            logger.error("Session cleanup error: {}", e)
+
 # Create tables on startup
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting PDF Prodigy API...")
+    # Build the shared PDFService up front so the first request doesn't pay for it,
+    # and give it the process pool that lives as long as the app. Imported here so
+    # importing main stays as cheap as the controllers' lazy get_pdf_service
+    from app.services.pdf_service import create_process_pool
+    app.state.pdf_pool = create_process_pool(settings.PDF_WORKERS)
+    get_pdf_service().pool = app.state.pdf_pool
+    app.state.session_cleanup = asyncio.create_task(cleanup_sessions_periodically())
+    # Request handlers offload blocking file I/O to threads; size both pools
+    # (anyio's for run_in_threadpool, asyncio's for to_thread) past their defaults
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREAD_POOL_SIZE
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=settings.THREAD_POOL_SIZE)
+    )
     # Create database tables
     # Base.metadata.create_all(bind=engine)
     logger.info("Database tables created successfully")
@@ -190,13 +239,21 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("Shutting down PDF Prodigy API...")
+    app.state.session_cleanup.cancel()
+    # Draining in-flight PDF jobs blocks, so wait for it off the event loop
+    await asyncio.to_thread(app.state.pdf_pool.shutdown, True)
 
 if __name__ == "__main__":
+    # uvloop/httptools only under ENV=production, uvicorn's "auto" choices otherwise
+    production = os.getenv("ENV") == "production"
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
         reload=settings.DEBUG,
         log_level=settings.LOG_LEVEL.lower(),
-        workers=1 if settings.DEBUG else 4
+        access_log=settings.DEBUG,  # add_process_time_header already logs each request
+        workers=(os.cpu_count() or 1) if not settings.DEBUG else 1,
+        loop="uvloop" if production else "auto",
+        http="httptools" if production else "auto"
     )
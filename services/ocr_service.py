@@ -2,17 +2,225 @@
 OCR Service for extracting text from PDF files using PyMuPDF and Tesseract
 """
 import fitz  # PyMuPDF
+import numpy as np
 import pytesseract
 from PIL import Image
-import io
+import hashlib
+import html
+import json
 import logging
-from typing import List, Dict, Any, Tuple
+import multiprocessing
+import os
+import subprocess
+import tempfile
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, NamedTuple, Optional, Tuple, Union
 import re
 
+# One Tesseract thread per OCR worker, since the pool already runs one page per
+# core. OpenMP reads this when libtesseract loads, so it must precede the import.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+
+# Optional: tesserocr binds libtesseract in-process, so the language model is
+# loaded once per worker instead of once per page by a tesseract subprocess
+try:
+    from tesserocr import PyTessBaseAPI, PSM, RIL, iterate_level
+except ImportError:
+    PyTessBaseAPI = None
+
 logger = logging.getLogger(__name__)
 
+# MuPDF's store caches decoded images and fonts for as long as a document is
+# open; it is emptied every few rendered pages so scanned books don't grow RSS
+# with page count. MuPDF's own stderr diagnostics are not useful here either.
+_STORE_SHRINK_EVERY = 5
+fitz.TOOLS.mupdf_display_errors(False)
+
+# Tesseract API handles are not thread-safe, so each thread gets its own
+_tess_local = threading.local()
+
+
+def _get_tess_api():
+    """Return this thread's persistent Tesseract API, or None without tesserocr"""
+    if PyTessBaseAPI is None:
+        return None
+    api = getattr(_tess_local, "api", None)
+    if api is None:
+        api = _tess_local.api = PyTessBaseAPI(psm=PSM.AUTO)
+    return api
+
+
+def _init_ocr_worker() -> None:
+    """Process-pool initializer: load the Tesseract model before the first page"""
+    try:
+        _get_tess_api()
+    except Exception as e:
+        logger.warning(f"tesserocr unavailable, falling back to pytesseract: {e}")
+
+
+def _ocr_words(image: Image.Image) -> Tuple[List[str], List[int]]:
+    """Recognize words and their confidences (0-100, -1 when unknown)"""
+    api = _get_tess_api()
+    if api is None:
+        ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
+        return ocr_data['text'], [int(conf) for conf in ocr_data['conf']]
+    
+    api.SetImage(image)
+    api.Recognize()
+    words, confs = [], []
+    iterator = api.GetIterator()
+    if iterator is not None:
+        for word in iterate_level(iterator, RIL.WORD):
+            words.append(word.GetUTF8Text(RIL.WORD) or "")
+            confs.append(int(word.Confidence(RIL.WORD)))
+    return words, confs
+
+
+# A rendered page as raw pixels: (PIL mode, width, height, samples)
+RawImage = Tuple[str, int, int, bytes]
+
+class TextElement(NamedTuple):
+    """A text span with its position on the page"""
+    text: str
+    x: float
+    y: float
+    width: float
+    height: float
+    font: str
+    size: float
+    flags: int
+
+
+# get_text("dict") flags without image preservation, which would copy every
+# embedded image into the result only for it to be skipped
+_TEXT_DICT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+# Pages wider than this at 2x are rendered at 1.5x instead
+_MAX_OCR_RENDER_WIDTH = 2000
+
+# OCR result for pages that were not OCR'd: (text, confidence)
+_NO_OCR = ("", 0)
+
+
+def _ocr_image(raw_image: RawImage, page_num: int) -> Tuple[str, float]:
+    """
+    Run Tesseract on one rendered page image (runs in a worker process)
+    
+    Returns:
+        Tuple of (OCR text, average word confidence); empty on failure
+    """
+    try:
+        mode, width, height, samples = raw_image
+        image = Image.frombytes(mode, (width, height), samples)
+        
+        # Get OCR text with confidence data
+        return _summarize_words(*_ocr_words(image))
+        
+    except Exception as e:
+        logger.warning(f"OCR failed for page {page_num}: {e}")
+        return "", 0
+
+
+def _summarize_words(words: List[str], word_confs: List[int]) -> Tuple[str, float]:
+    """Join recognized words into page text and average their confidences"""
+    ocr_text = " ".join([word for word in words if word.strip()])
+    
+    # Calculate average confidence
+    confidences = np.fromiter(word_confs, dtype=np.int32, count=len(word_confs))
+    confidences = confidences[confidences > 0]
+    ocr_confidence = float(confidences.mean()) if confidences.size else 0
+    
+    return ocr_text, ocr_confidence
+
+
+# Without tesserocr, pages go to the tesseract CLI in batches: one run reads a
+# list of page images, so the language model is loaded once per batch
+_OCR_BATCH_SIZE = 8
+_HOCR_PAGE_RE = re.compile(r"<div class=['\"]ocr_page['\"]")
+_HOCR_WORD_RE = re.compile(r"<span class=['\"]ocrx_word['\"][^>]*?x_wconf (-?\d+)[^>]*>(.*?)</span>", re.S)
+_HTML_TAG_RE = re.compile(r"<[^>]+>")
+
+
+def _parse_hocr(hocr: str) -> List[Tuple[List[str], List[int]]]:
+    """Split multi-page hOCR output into per-page (words, confidences)"""
+    pages = []
+    for page in _HOCR_PAGE_RE.split(hocr)[1:]:
+        words, confs = [], []
+        for conf, word in _HOCR_WORD_RE.findall(page):
+            # Words may carry <strong>/<em> markup and HTML entities
+            words.append(html.unescape(_HTML_TAG_RE.sub("", word)))
+            confs.append(int(conf))
+        pages.append((words, confs))
+    return pages
+
+
+def _ocr_batch(raw_images: List[RawImage], page_nums: List[int]) -> List[Tuple[str, float]]:
+    """
+    Run Tesseract on several rendered pages (runs in a worker process)
+    
+    Returns:
+        One (OCR text, average word confidence) tuple per page, in order
+    """
+    if len(raw_images) == 1 or PyTessBaseAPI is not None:
+        return [_ocr_image(raw_image, page_num) for raw_image, page_num in zip(raw_images, page_nums)]
+    
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            image_paths = []
+            for i, (mode, width, height, samples) in enumerate(raw_images):
+                image_path = os.path.join(tmp_dir, f"page_{i}.tif")
+                Image.frombytes(mode, (width, height), samples).save(image_path)
+                image_paths.append(image_path)
+            
+            filelist = os.path.join(tmp_dir, "filelist.txt")
+            with open(filelist, "w") as f:
+                f.write("\n".join(image_paths))
+            
+            subprocess.run(
+                [pytesseract.pytesseract.tesseract_cmd, filelist, os.path.join(tmp_dir, "out"), "hocr"],
+                check=True, capture_output=True
+            )
+            with open(os.path.join(tmp_dir, "out.hocr"), encoding="utf-8") as f:
+                pages = _parse_hocr(f.read())
+        
+        if len(pages) != len(raw_images):
+            raise ValueError(f"expected {len(raw_images)} pages of hOCR, got {len(pages)}")
+        return [_summarize_words(words, confs) for words, confs in pages]
+        
+    except Exception as e:
+        logger.warning(f"Batch OCR failed for pages {page_nums[0]}-{page_nums[-1]}, retrying per page: {e}")
+        return [_ocr_image(raw_image, page_num) for raw_image, page_num in zip(raw_images, page_nums)]
+
+
+# Upper bound on the on-disk result cache; least recently used entries are evicted
+_MAX_CACHE_BYTES = 256 << 20
+
+# Files are hashed in 1 MiB chunks for the result cache key
+_HASH_CHUNK_SIZE = 1 << 20
+
+# Prefix of extraction result cache keys; bump it whenever the result format
+# changes so entries written by older versions are never returned (they age
+# out through LRU eviction). v2 added the 'engine' field.
+_RESULT_CACHE_VERSION = "v2"
+
+# Text cleaning: whitespace runs, and the ASCII control characters left after
+# whitespace is collapsed (the only ASCII characters str.isprintable rejects)
+_WS_RE = re.compile(r'\s+')
+_ASCII_CONTROL_RE = re.compile(r'[\x00-\x1f\x7f]')
+
+# Common English words; readable text of five or more words contains at least one
+_COMMON_WORDS = frozenset({'the', 'and', 'to', 'of', 'a', 'in', 'for', 'is', 'on', 'that', 'by', 'this', 'with', 'from', 'at', 'as'})
+
+
 class OCRService:
-    def __init__(self):
+    def __init__(self, max_workers: Optional[int] = None,
+                 cache_dir: Union[str, Path] = "~/.cache/pdf-prodigy/ocr",
+                 max_cache_bytes: int = _MAX_CACHE_BYTES):
         """Initialize OCR service with configuration"""
         # Configure Tesseract (you may need to adjust the path based on your system)
         # On macOS with Homebrew: brew install tesseract
@@ -20,90 +228,301 @@ class OCRService:
             pytesseract.get_tesseract_version()
         except Exception as e:
             logger.warning(f"Tesseract not found or not configured properly: {e}")
+        
+        # Pages are OCR'd in parallel by a process pool, started on first use
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        
+        # Extraction results keyed by file content hash; a key's result never
+        # changes, so entries need no invalidation, only LRU eviction by total size
+        self.cache_dir = Path(cache_dir).expanduser()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_cache_bytes = max_cache_bytes
+        self._cache_entries: "OrderedDict[str, int]" = OrderedDict()
+        self._cache_bytes = 0
+        self._cache_lock = threading.Lock()
+        self._index_cache()
+    
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Return the shared OCR process pool, creating it on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn, not fork: the server process already runs threads
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_ocr_worker
+                )
+            return self._pool
+    
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        """Forget a broken pool (unless already replaced) and release its resources"""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
     
-    def extract_text_from_pdf(self, pdf_path: str) -> Dict[str, Any]:
+    def extract_text_from_pdf(self, pdf_path: str, content_hash: Optional[str] = None) -> Dict[str, Any]:
         """
         Extract text from PDF using both native text extraction and OCR
         
         Args:
             pdf_path: Path to the PDF file
+            content_hash: BLAKE2b-128 hex digest of the file, if the caller
+                already has one (uploads are hashed while being written);
+                saves re-reading the file to compute the cache key
             
         Returns:
             Dictionary containing extracted text and metadata
         """
         try:
-            doc = fitz.open(pdf_path)
-            pages_data = []
+            cache_key = (f"{_RESULT_CACHE_VERSION}-blake2b-{content_hash}" if content_hash
+                         else f"{_RESULT_CACHE_VERSION}-sha256-{self._cache_key(pdf_path)}")
+            cached = self._load_cached(cache_key)
+            if cached is not None:
+                return cached
+            
+            try:
+                result = self._extract_uncached(pdf_path)
+            except BrokenProcessPool as e:
+                # A worker died (e.g. Tesseract OOM or a segfault) and broke the pool;
+                # _extract_uncached discarded it, so retry once on a fresh one
+                logger.warning(f"OCR worker pool broke, retrying on a new pool: {e}")
+                result = self._extract_uncached(pdf_path)
+            
+            self._store_cached(cache_key, result)
+            return result
+            
+        except Exception as e:
+            logger.error(f"Error extracting text from PDF: {e}")
+            raise
+    
+    def _extract_uncached(self, pdf_path: str) -> Dict[str, Any]:
+        """Render every page, OCR the ones that need it and assemble the result"""
+        pool = None
+        try:
+            # Rendered pages waiting for OCR are held in memory; cap the batches in flight
+            max_in_flight = self.max_workers + 1
+            
+            # Pages are rendered here and OCR'd by the pool as soon as a batch is ready,
+            # so rendering overlaps with Tesseract running on earlier pages
+            rendered = []  # [page_data, batch future or None, position in batch]
+            batch = []  # (index in rendered, page_num, raw_image)
+            in_flight = deque()
+            
+            def submit_batch():
+                nonlocal pool
+                while len(in_flight) >= max_in_flight:
+                    in_flight.popleft().result()
+                # The pool is only needed (and started) once a page actually needs OCR;
+                # documents with a good text layer on every page never touch Tesseract
+                if pool is None:
+                    pool = self._get_pool()
+                future = pool.submit(
+                    _ocr_batch,
+                    [raw_image for _, _, raw_image in batch],
+                    [page_num for _, page_num, _ in batch]
+                )
+                for position, (index, _, _) in enumerate(batch):
+                    rendered[index][1:] = [future, position]
+                in_flight.append(future)
+                batch.clear()
             
-            for page_num in range(len(doc)):
-                page = doc[page_num]
-                page_data = self._process_page(page, page_num)
-                pages_data.append(page_data)
+            doc = fitz.open(pdf_path)
+            try:
+                # tesserocr workers keep their model loaded, so pages go one at a
+                # time; the CLI fallback batches, but never so much that workers idle
+                batch_size = 1
+                if PyTessBaseAPI is None:
+                    batch_size = max(1, min(_OCR_BATCH_SIZE, len(doc) // self.max_workers))
+                
+                for page_num in range(len(doc)):
+                    page_data, raw_image = self._render_page(doc[page_num], page_num)
+                    rendered.append([page_data, None, 0])
+                    if raw_image is not None:
+                        batch.append((len(rendered) - 1, page_num, raw_image))
+                        if len(batch) >= batch_size:
+                            submit_batch()
+                    raw_image = None
+                    if (page_num + 1) % _STORE_SHRINK_EVERY == 0:
+                        fitz.TOOLS.store_shrink(100)
+                if batch:
+                    submit_batch()
+            finally:
+                doc.close()
             
-            doc.close()
+            # Results are collected in page order
+            pages_data = [
+                self._finish_page(page_data, *(future.result()[position] if future is not None else _NO_OCR))
+                for page_data, future, position in rendered
+            ]
             
             # Analyze overall document structure
             total_native_text = sum(len(page['native_text']) for page in pages_data)
             total_ocr_text = sum(len(page['ocr_text']) for page in pages_data)
             
-            return {
+            result = {
                 'pages': pages_data,
                 'total_pages': len(pages_data),
                 'native_text_length': total_native_text,
                 'ocr_text_length': total_ocr_text,
                 'is_scanned_document': total_native_text < (total_ocr_text * 0.1),  # Mostly scanned if native text is minimal
-                'confidence_score': self._calculate_confidence(pages_data)
+                'confidence_score': self._calculate_confidence(pages_data),
+                # "native" when every page's text layer was used without running OCR
+                'engine': "ocr" if any(future is not None for _, future, _ in rendered) else "native"
             }
-            
-        except Exception as e:
-            logger.error(f"Error extracting text from PDF: {e}")
+            return result
+        except BrokenProcessPool:
+            # The pool is unusable from here on; drop it so the next call starts a new one
+            if pool is not None:
+                self._discard_pool(pool)
             raise
     
-    def _process_page(self, page: fitz.Page, page_num: int) -> Dict[str, Any]:
+    def _cache_key(self, pdf_path: str) -> str:
+        """SHA-256 of the file contents, streamed in fixed-size chunks"""
+        hasher = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            while chunk := f.read(_HASH_CHUNK_SIZE):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+    
+    def _index_cache(self) -> None:
+        """Load the entries already on disk, least recently used first, and trim to size"""
+        entries = []
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".json"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, entry.name[:-5], st.st_size))
+        entries.sort()
+        with self._cache_lock:
+            for _, cache_key, size in entries:
+                self._cache_entries[cache_key] = size
+                self._cache_bytes += size
+        self._record_cached(None, 0)
+    
+    def _record_cached(self, cache_key: Optional[str], size: int) -> None:
+        """Account for a stored entry (if any), then evict least recently used entries over the bound"""
+        evicted = []
+        with self._cache_lock:
+            if cache_key is not None:
+                self._cache_bytes += size - self._cache_entries.pop(cache_key, 0)
+                self._cache_entries[cache_key] = size
+            # Never evict the entry just stored, even if it alone exceeds the bound
+            while self._cache_bytes > self.max_cache_bytes and len(self._cache_entries) > 1:
+                old_key, old_size = self._cache_entries.popitem(last=False)
+                self._cache_bytes -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.unlink(self.cache_dir / f"{old_key}.json")
+            except FileNotFoundError:
+                pass
+    
+    def _load_cached(self, cache_key: str) -> Optional[Any]:
+        """Return a cached extraction result, or None on a miss"""
+        path = self.cache_dir / f"{cache_key}.json"
+        try:
+            with open(path, "rb") as f:
+                result = json.loads(f.read())
+        except FileNotFoundError:
+            # Evicted by another process sharing the cache directory
+            with self._cache_lock:
+                self._cache_bytes -= self._cache_entries.pop(cache_key, 0)
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable OCR cache entry {cache_key}: {e}")
+            return None
+        
+        # Mark as recently used, here and (through the mtime) for the next startup
+        with self._cache_lock:
+            if cache_key in self._cache_entries:
+                self._cache_entries.move_to_end(cache_key)
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return result
+    
+    def _store_cached(self, cache_key: str, result: Any) -> None:
+        """Write an extraction result to the cache atomically; failures are only logged"""
+        tmp_path = None
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(result, f)
+                f.flush()
+                size = os.fstat(f.fileno()).st_size
+            os.replace(tmp_path, self.cache_dir / f"{cache_key}.json")
+            self._record_cached(cache_key, size)
+        except OSError as e:
+            logger.warning(f"Failed to cache OCR result {cache_key}: {e}")
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+    
+    def _render_page(self, page: fitz.Page, page_num: int) -> Tuple[Dict[str, Any], Optional[RawImage]]:
         """
-        Process a single page with both native text extraction and OCR
+        Collect a page's native text and metadata and render it for OCR
         
         Args:
             page: PyMuPDF page object
             page_num: Page number
             
         Returns:
-            Dictionary containing page text and metadata
+            Tuple of (partial page data, raw page image or None when the
+            native text is good enough that OCR would not be used)
         """
         # Extract native text
-        native_text = page.get_text()
+        native_text_clean = self._clean_text(page.get_text())
         
         # Get page dimensions
         rect = page.rect
         
-        # Convert page to image for OCR
-        pix = page.get_pixmap(matrix=fitz.Matrix(2, 2))  # 2x scaling for better OCR
-        img_data = pix.tobytes("png")
-        pix = None  # Free memory
+        # Convert page to image for OCR; raw samples go straight to PIL, with
+        # no PNG encode here and decode in the worker. Born-digital pages with
+        # readable text would pick native text anyway, so they skip both
+        raw_image = None
+        if not self._is_good_native_text(native_text_clean):
+            # Tesseract works on grayscale, so render one byte per pixel instead of
+            # RGB; 2x scaling for better OCR, 1.5x for pages already large
+            scale = 2 if rect.width * 2 <= _MAX_OCR_RENDER_WIDTH else 1.5
+            pix = page.get_pixmap(matrix=fitz.Matrix(scale, scale), colorspace=fitz.csGRAY, alpha=False)
+            raw_image = ("L", pix.width, pix.height, pix.samples)
+            pix = None  # Free memory
         
-        # Perform OCR
-        image = Image.open(io.BytesIO(img_data))
-        ocr_text = ""
-        ocr_confidence = 0
+        page_data = {
+            'page_number': page_num + 1,
+            'native_text': native_text_clean,
+            'dimensions': {
+                'width': rect.width,
+                'height': rect.height
+            },
+            'has_images': len(page.get_images()) > 0
+        }
+        return page_data, raw_image
+    
+    def _finish_page(self, page_data: Dict[str, Any], ocr_text: str, ocr_confidence: float) -> Dict[str, Any]:
+        """
+        Combine a rendered page with its OCR result and pick the best text source
         
-        try:
-            # Get OCR text with confidence data
-            ocr_data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-            ocr_text = " ".join([word for word in ocr_data['text'] if word.strip()])
-            
-            # Calculate average confidence
-            confidences = [int(conf) for conf in ocr_data['conf'] if int(conf) > 0]
-            ocr_confidence = sum(confidences) / len(confidences) if confidences else 0
+        Args:
+            page_data: Partial page data from _render_page
+            ocr_text: Text recognized by Tesseract (empty if OCR was skipped)
+            ocr_confidence: Average word confidence of the OCR text
             
-        except Exception as e:
-            logger.warning(f"OCR failed for page {page_num}: {e}")
-        
+        Returns:
+            Dictionary containing page text and metadata
+        """
         # Determine best text source
-        native_text_clean = self._clean_text(native_text)
+        native_text_clean = page_data['native_text']
         ocr_text_clean = self._clean_text(ocr_text)
         
         # Choose best text based on content quality
-        if len(native_text_clean) > 50 and self._is_readable_text(native_text_clean):
+        if self._is_good_native_text(native_text_clean):
             best_text = native_text_clean
             text_source = "native"
         elif len(ocr_text_clean) > 10 and ocr_confidence > 60:
@@ -114,30 +533,36 @@ class OCRService:
             text_source = "hybrid"
         
         return {
-            'page_number': page_num + 1,
+            'page_number': page_data['page_number'],
             'native_text': native_text_clean,
             'ocr_text': ocr_text_clean,
             'best_text': best_text,
             'text_source': text_source,
             'ocr_confidence': ocr_confidence,
-            'dimensions': {
-                'width': rect.width,
-                'height': rect.height
-            },
-            'has_images': len(page.get_images()) > 0,
+            'dimensions': page_data['dimensions'],
+            'has_images': page_data['has_images'],
             'word_count': len(best_text.split())
         }
     
+    def _is_good_native_text(self, text: str) -> bool:
+        """Whether cleaned native text is long and readable enough to use as-is"""
+        return len(text) > 50 and self._is_readable_text(text)
+    
     def _clean_text(self, text: str) -> str:
         """Clean and normalize extracted text"""
         if not text:
             return ""
         
-        # Remove excessive whitespace
-        text = re.sub(r'\s+', ' ', text)
+        # Remove excessive whitespace (this also turns newlines and tabs into spaces)
+        text = _WS_RE.sub(' ', text)
         
-        # Remove non-printable characters except newlines and tabs
-        text = ''.join(char for char in text if char.isprintable() or char in '\n\t')
+        # Remove non-printable characters; one C-level check covers the common
+        # case where there are none
+        if not text.isprintable():
+            if text.isascii():
+                text = _ASCII_CONTROL_RE.sub('', text)
+            else:
+                text = ''.join(filter(str.isprintable, text))
         
         return text.strip()
     
@@ -155,21 +580,19 @@ class OCRService:
             return False
         
         # Count alphabetic characters
-        alpha_chars = sum(1 for char in text if char.isalpha())
-        total_chars = len(text.replace(' ', ''))
+        alpha_chars = sum(map(str.isalpha, text))
+        total_chars = len(text) - text.count(' ')
         
         if total_chars == 0:
             return False
         
         # Text should be mostly alphabetic
-        alpha_ratio = alpha_chars / total_chars
+        if alpha_chars / total_chars <= 0.5:
+            return False
         
-        # Check for common English words
+        # Check for common English words; isdisjoint stops at the first match
         words = text.lower().split()
-        common_words = {'the', 'and', 'to', 'of', 'a', 'in', 'for', 'is', 'on', 'that', 'by', 'this', 'with', 'from', 'at', 'as'}
-        common_word_count = sum(1 for word in words if word in common_words)
-        
-        return alpha_ratio > 0.5 and (len(words) < 5 or common_word_count > 0)
+        return len(words) < 5 or not _COMMON_WORDS.isdisjoint(words)
     
     def _calculate_confidence(self, pages_data: List[Dict[str, Any]]) -> float:
         """
@@ -184,66 +607,87 @@ class OCRService:
         if not pages_data:
             return 0
         
-        total_confidence = 0
-        total_weight = 0
-        
-        for page_data in pages_data:
-            word_count = page_data['word_count']
-            if word_count > 0:
-                if page_data['text_source'] == 'native':
-                    confidence = 95  # High confidence for native text
-                elif page_data['text_source'] == 'ocr':
-                    confidence = page_data['ocr_confidence']
-                else:
-                    confidence = 70  # Medium confidence for hybrid
-                
-                total_confidence += confidence * word_count
-                total_weight += word_count
+        # Word-count-weighted mean; pages without words carry no weight
+        word_counts = np.fromiter(
+            (page_data['word_count'] for page_data in pages_data),
+            dtype=np.float64, count=len(pages_data)
+        )
+        confidences = np.fromiter(
+            (
+                95 if page_data['text_source'] == 'native'  # High confidence for native text
+                else page_data['ocr_confidence'] if page_data['text_source'] == 'ocr'
+                else 70  # Medium confidence for hybrid
+                for page_data in pages_data
+            ),
+            dtype=np.float64, count=len(pages_data)
+        )
         
-        return total_confidence / total_weight if total_weight > 0 else 0
+        total_weight = word_counts.sum()
+        return float(word_counts @ confidences / total_weight) if total_weight > 0 else 0
     
-    def extract_text_with_positions(self, pdf_path: str, page_num: int) -> List[Dict[str, Any]]:
+    def extract_text_with_positions(self, pdf_path: str, page_num: int,
+                                    content_hash: Optional[str] = None) -> List[Dict[str, Any]]:
         """
         Extract text with position information for a specific page
         
         Args:
             pdf_path: Path to the PDF file
             page_num: Page number (0-indexed)
+            content_hash: BLAKE2b hex digest of the file; when given, results are
+                cached per page under it (hashing the file here would cost more
+                than the extraction)
             
         Returns:
             List of text elements with position data
         """
         try:
-            doc = fitz.open(pdf_path)
-            page = doc[page_num]
-            
-            # Get text with position information
-            text_dict = page.get_text("dict")
-            text_elements = []
-            
-            for block in text_dict["blocks"]:
-                if block.get("type") == 0:  # Text block
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            if span["text"].strip():
-                                bbox = span["bbox"]
-                                text_elements.append({
-                                    "text": span["text"],
-                                    "x": bbox[0],
-                                    "y": bbox[1],
-                                    "width": bbox[2] - bbox[0],
-                                    "height": bbox[3] - bbox[1],
-                                    "font": span["font"],
-                                    "size": span["size"],
-                                    "flags": span["flags"]
-                                })
-            
-            doc.close()
-            return text_elements
+            if content_hash:
+                cache_key = f"blake2b-{content_hash}.page{page_num}"
+                cached = self._load_cached(cache_key)
+                if cached is not None:
+                    return cached
+            
+            elements = [element._asdict() for element in self._iter_text_with_positions(pdf_path, page_num)]
+            
+            if content_hash:
+                self._store_cached(cache_key, elements)
+            return elements
             
         except Exception as e:
             logger.error(f"Error extracting positioned text: {e}")
             raise
+    
+    def _iter_text_with_positions(self, pdf_path: str, page_num: int) -> Iterator[TextElement]:
+        """
+        Yield the non-blank text spans of a page one at a time
+        
+        Args:
+            pdf_path: Path to the PDF file
+            page_num: Page number (0-indexed)
+            
+        Yields:
+            Text elements with position data
+        """
+        # Get text with position information
+        with fitz.open(pdf_path) as doc:
+            text_dict = doc[page_num].get_text("dict", flags=_TEXT_DICT_FLAGS)
+        
+        for block in text_dict["blocks"]:
+            if block.get("type") == 0:  # Text block
+                for line in block["lines"]:
+                    for span in line["spans"]:
+                        if span["text"].strip():
+                            x0, y0, x1, y1 = span["bbox"]
+                            yield TextElement(
+                                span["text"], x0, y0, x1 - x0, y1 - y0,
+                                span["font"], span["size"], span["flags"]
+                            )
 
-# Global OCR service instance
-ocr_service = OCRService()
+@lru_cache(maxsize=1)
+def get_ocr_service() -> OCRService:
+    """
+    Shared OCRService instance, created on first use. Not built at import time:
+    spawned pool workers re-import this module and would otherwise each probe
+    Tesseract and re-index (and evict from) the result cache.
+    """
+    return OCRService()
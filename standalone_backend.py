@@ -5,19 +5,22 @@ This is a simplified version that doesn't depend on the complex app structure
 
 from fastapi import FastAPI, UploadFile, File, HTTPException, status, Path, Body
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.responses import JSONResponse, FileResponse, ORJSONResponse
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import uvicorn
+import asyncio
 import os
-import shutil
 from pathlib import Path as PathLib
 import uuid
+from functools import lru_cache
+import hashlib
 import re
 import logging
-import json
+import threading
+import orjson
 from datetime import datetime
-from services.ocr_service import ocr_service
+from services.ocr_service import get_ocr_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -25,17 +28,20 @@ logger = logging.getLogger("pdf_prodigy")
 
 # Configuration
 UPLOAD_DIR = "./uploads"
+UPLOAD_CHUNK_SIZE = 1 << 20  # Uploads are hashed and copied in 1 MiB chunks
 CORS_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:3002", "http://127.0.0.1:3002", "http://localhost:3003", "http://127.0.0.1:3003"]
 
-# Create upload directory
-upload_path = PathLib(UPLOAD_DIR)
-upload_path.mkdir(parents=True, exist_ok=True)
+# Create upload directory; handlers share this Path rather than building their own
+UPLOAD_DIR_PATH = PathLib(UPLOAD_DIR)
+UPLOAD_DIR_PATH.mkdir(parents=True, exist_ok=True)
 
 # Create FastAPI instance
 app = FastAPI(
     title="PDF Prodigy API",
     version="1.0.0",
     description="A simple PDF processing service for basic integration",
+    # OCR and positioned-text responses can hold thousands of elements
+    default_response_class=ORJSONResponse,
 )
 
 # CORS Middleware
@@ -78,26 +84,154 @@ class AnnotationResponse(BaseModel):
     annotation_count: int = Field(..., description="Number of annotations saved")
 
 # Utility functions
+# Characters outside [\w\-.] are replaced with '_'. ASCII names go through a
+# translate table; the regex is only needed for non-ASCII names
+_SANITIZE_RE = re.compile(r'[^\w\-_\.]')
+_ASCII_SAFE = frozenset('abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-.')
+_ASCII_TRANS = str.maketrans({chr(c): '_' for c in range(128) if chr(c) not in _ASCII_SAFE})
+# File IDs issued by upload_files are "{BLAKE2b-128 content digest}-{random suffix}":
+# the digest dedupes storage and keys the OCR cache, the suffix gives every upload
+# its own annotations and download name. Earlier uploads have bare digests or UUIDs
+_CONTENT_ID_RE = re.compile(r'([0-9a-f]{32})(?:-[0-9a-f]{16})?')
+
+def content_hash_of(file_id: str) -> Optional[str]:
+    """Return the content digest embedded in a file ID, or None for UUID IDs"""
+    match = _CONTENT_ID_RE.fullmatch(file_id)
+    return match.group(1) if match else None
+
+# Both helpers are pure functions of the client filename, which batch uploads
+# and re-uploads tend to repeat
+@lru_cache(maxsize=1024)
 def validate_file_extension(filename: str) -> bool:
     """Validate if file has a supported extension"""
-    if not filename:
-        return False
-    extension = PathLib(filename).suffix.lower()
-    return extension == '.pdf'
+    # Tail compare instead of building a Path for its suffix
+    return bool(filename) and len(filename) > 4 and filename[-4:].lower() == '.pdf'
 
+@lru_cache(maxsize=1024)
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe storage"""
     if not filename:
         return "unnamed_file.pdf"
     
     filename = os.path.basename(filename)
-    filename = re.sub(r'[^\w\-_\.]', '_', filename)
+    if filename.isascii():
+        filename = filename.translate(_ASCII_TRANS)
+    else:
+        filename = _SANITIZE_RE.sub('_', filename)
     
     if not filename.endswith('.pdf'):
         filename += '.pdf'
     
     return filename
 
+def _save_upload(src, sanitized_filename: str) -> Tuple[str, int]:
+    """
+    Store one upload under a new file ID built from its content digest (blocking).
+    Identical uploads get distinct IDs but share one copy on disk through hard
+    links (and one OCR cache entry).
+    Returns (file_id, size).
+    """
+    temp_path = UPLOAD_DIR_PATH / f".{uuid.uuid4().hex}.upload"
+    try:
+        # One pass: each chunk is read once into a reused buffer, hashed and written
+        hasher = hashlib.blake2b(digest_size=16)
+        file_size = 0
+        buf = bytearray(UPLOAD_CHUNK_SIZE)
+        view = memoryview(buf)
+        with open(temp_path, "wb") as buffer:
+            while n := src.readinto(buf):
+                hasher.update(view[:n])
+                buffer.write(view[:n])
+                file_size += n
+        digest = hasher.hexdigest()
+        
+        file_id = f"{digest}-{uuid.uuid4().hex[:16]}"
+        file_path = UPLOAD_DIR_PATH / f"{file_id}_{sanitized_filename}"
+        # Uploads are saved concurrently; check-and-link under the index lock so
+        # identical files in one request share one copy. Only O(1) checks happen
+        # under the lock, never a directory scan
+        with _INDEX_LOCK:
+            existing_path = _CONTENT_INDEX.get(digest)
+            linked = False
+            if existing_path is not None:
+                try:
+                    os.link(existing_path, file_path)
+                    linked = True
+                except OSError:
+                    # Copy removed since, or no hard links on this filesystem
+                    pass
+            if linked:
+                os.unlink(temp_path)
+            else:
+                os.replace(temp_path, file_path)
+                _CONTENT_INDEX[digest] = file_path
+            _FILE_INDEX[file_id] = file_path
+    except BaseException:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    return file_id, file_size
+
+# file_id -> stored upload, so lookups don't scan the upload directory
+_FILE_INDEX: Dict[str, PathLib] = {}
+# content digest -> a stored upload with those bytes, for hard-linking duplicates
+_CONTENT_INDEX: Dict[str, PathLib] = {}
+_INDEX_LOCK = threading.Lock()  # Serializes index updates from upload worker threads
+
+def index_uploads() -> None:
+    """Rebuild the file index from the upload directory"""
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            file_id, sep, name = entry.name.partition("_")
+            if sep and name.endswith('.pdf') and entry.is_file():
+                _FILE_INDEX[file_id] = path = PathLib(entry.path)
+                digest = content_hash_of(file_id)
+                if digest is not None:
+                    _CONTENT_INDEX[digest] = path
+
+def _scan_for_upload(file_id: str) -> Optional[PathLib]:
+    """Find a stored upload by walking the upload directory, stopping at the first match"""
+    # A prefix test per entry; glob would compile an fnmatch pattern on every call
+    prefix = file_id + "_"
+    with os.scandir(UPLOAD_DIR) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith(prefix) and name.endswith('.pdf'):
+                return PathLib(entry.path)
+    return None
+
+def find_upload(file_id: str) -> Optional[PathLib]:
+    """Return the stored upload for a file ID, or None if there is none"""
+    file_path = _FILE_INDEX.get(file_id)
+    if file_path is None:
+        # Uploaded by another worker process, or after the index was built
+        file_path = _scan_for_upload(file_id)
+        if file_path is None:
+            return None
+        _FILE_INDEX[file_id] = file_path
+    return file_path
+
+def _model_fields(obj: Any) -> Dict[str, Any]:
+    """orjson fallback for Pydantic models with plain fields, skipping model_dump"""
+    if isinstance(obj, BaseModel):
+        return obj.__dict__
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+def _write_json(path: PathLib, data: Any) -> None:
+    # Compact output: these files are only read back by get_annotations
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data, default=_model_fields))
+
+def _read_json(path: PathLib) -> Any:
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+@app.on_event("startup")
+async def startup_event():
+    index_uploads()
+
 # API Routes
 @app.get("/")
 async def root():
@@ -123,7 +257,6 @@ async def upload_files(
     """Upload PDF files for processing"""
     try:
         uploaded_files = []
-        upload_dir = PathLib(UPLOAD_DIR)
         
         for file in files:
             # Validate file extension
@@ -132,20 +265,18 @@ async def upload_files(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail=f"Invalid file type: {file.filename}. Only PDF files are supported."
                 )
-            
-            # Generate unique file ID and sanitize filename
-            file_id = str(uuid.uuid4())
-            sanitized_filename = sanitize_filename(file.filename)
-            file_path = upload_dir / f"{file_id}_{sanitized_filename}"
-            
-            # Save file
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
-            
-            # Get file size
-            file_size = file_path.stat().st_size
-            
-            file_info = FileInfo(
+        
+        # Save all files concurrently, one worker thread per file. A single blocking
+        # helper matches or beats aiofiles' thread hop per chunk at every size measured
+        sanitized_filenames = [sanitize_filename(file.filename) for file in files]
+        saved = await asyncio.gather(*(
+            asyncio.to_thread(_save_upload, file.file, sanitized_filename)
+            for file, sanitized_filename in zip(files, sanitized_filenames)
+        ))
+        
+        for file, sanitized_filename, (file_id, file_size) in zip(files, sanitized_filenames, saved):
+            # Server-built values; skip validation (the response model still serializes them)
+            file_info = FileInfo.model_construct(
                 filename=sanitized_filename,
                 size=file_size,
                 mime_type=file.content_type or "application/pdf",
@@ -154,16 +285,16 @@ async def upload_files(
             )
             uploaded_files.append(file_info)
             
-            logger.info(f"Uploaded file: {sanitized_filename} with ID: {file_id}")
+            logger.info("Uploaded file: %s with ID: %s", sanitized_filename, file_id)
         
-        return UploadResponse(
+        return UploadResponse.model_construct(
             success=True,
             message=f"Successfully uploaded {len(uploaded_files)} file(s)",
             files=uploaded_files
         )
         
     except Exception as e:
-        logger.error(f"File upload error: {str(e)}")
+        logger.error("File upload error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="File upload failed"
@@ -183,7 +314,7 @@ async def validate_file(filename: str = Path(..., description="Filename to valid
         }
         
     except Exception as e:
-        logger.error(f"File validation error: {str(e)}")
+        logger.error("File validation error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="File validation failed"
@@ -193,46 +324,45 @@ async def validate_file(filename: str = Path(..., description="Filename to valid
 async def download_file(file_id: str = Path(..., description="File ID to download")):
     """Download a file by its ID (simulates S3-like file serving)"""
     try:
-        upload_dir = PathLib(UPLOAD_DIR)
-        
         # Find the file with the given ID
-        file_pattern = f"{file_id}_*"
-        matching_files = list(upload_dir.glob(file_pattern))
+        file_path = find_upload(file_id)
         
-        if not matching_files:
+        if file_path is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"File with ID {file_id} not found"
             )
         
-        file_path = matching_files[0]
-        
-        if not file_path.exists():
+        # One stat serves both the existence check and FileResponse's headers
+        try:
+            stat_result = os.stat(file_path)
+        except FileNotFoundError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found"
             )
         
-        # Extract original filename from the stored filename
-        stored_filename = file_path.name
-        original_filename = stored_filename.replace(f"{file_id}_", "", 1)
+        # Extract original filename from the stored "{file_id}_{filename}" name; the
+        # prefix length varies (32-char digests, 36-char legacy UUIDs), so slice by it
+        original_filename = file_path.name[len(file_id) + 1:]
         
         return FileResponse(
             path=str(file_path),
             filename=original_filename,
             media_type="application/pdf",
+            stat_result=stat_result,
             headers={
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "GET, POST, PUT, DELETE, OPTIONS",
                 "Access-Control-Allow-Headers": "*",
-                "Cache-Control": "no-cache",
+                "Cache-Control": "private, max-age=60",
             }
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"File download error: {str(e)}")
+        logger.error("File download error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="File download failed"
@@ -242,21 +372,19 @@ async def download_file(file_id: str = Path(..., description="File ID to downloa
 async def view_file(file_id: str = Path(..., description="File ID to view")):
     """View a file by its ID with proper headers for PDF.js"""
     try:
-        upload_dir = PathLib(UPLOAD_DIR)
-        
         # Find the file with the given ID
-        file_pattern = f"{file_id}_*"
-        matching_files = list(upload_dir.glob(file_pattern))
+        file_path = find_upload(file_id)
         
-        if not matching_files:
+        if file_path is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"File with ID {file_id} not found"
             )
         
-        file_path = matching_files[0]
-        
-        if not file_path.exists():
+        # One stat serves both the existence check and FileResponse's headers
+        try:
+            stat_result = os.stat(file_path)
+        except FileNotFoundError:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found"
@@ -265,6 +393,7 @@ async def view_file(file_id: str = Path(..., description="File ID to view")):
         return FileResponse(
             path=str(file_path),
             media_type="application/pdf",
+            stat_result=stat_result,
             headers={
                 "Access-Control-Allow-Origin": "*",
                 "Access-Control-Allow-Methods": "GET, HEAD, OPTIONS",
@@ -278,7 +407,7 @@ async def view_file(file_id: str = Path(..., description="File ID to view")):
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"File view error: {str(e)}")
+        logger.error("File view error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="File view failed"
@@ -291,30 +420,29 @@ async def save_annotations(
 ):
     """Save annotations for a PDF file"""
     try:
-        upload_dir = PathLib(UPLOAD_DIR)
-        
         # Verify file exists
-        file_pattern = f"{file_id}_*"
-        matching_files = list(upload_dir.glob(file_pattern))
+        file_path = find_upload(file_id)
         
-        if not matching_files:
+        if file_path is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"File with ID {file_id} not found"
             )
         
         # Save annotations as JSON
-        annotations_file = upload_dir / f"{file_id}_annotations.json"
+        # Annotation fields are plain JSON values, so orjson writes the validated
+        # models directly instead of a model_dump() copy of each one
+        created_at = datetime.now().isoformat()
+        annotations_file = UPLOAD_DIR_PATH / f"{file_id}_annotations.json"
         annotations_data = {
             "file_id": file_id,
-            "created_at": datetime.now().isoformat(),
-            "annotations": [annotation.dict() for annotation in request.annotations]
+            "created_at": created_at,
+            "annotations": request.annotations
         }
         
-        with open(annotations_file, 'w') as f:
-            json.dump(annotations_data, f, indent=2)
+        await asyncio.to_thread(_write_json, annotations_file, annotations_data)
         
-        logger.info(f"Saved {len(request.annotations)} annotations for file {file_id}")
+        logger.info("Saved %d annotations for file %s", len(request.annotations), file_id)
         
         return AnnotationResponse(
             success=True,
@@ -326,7 +454,7 @@ async def save_annotations(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error saving annotations: {str(e)}")
+        logger.error("Error saving annotations: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to save annotations"
@@ -336,23 +464,19 @@ async def save_annotations(
 async def get_annotations(file_id: str = Path(..., description="File ID")):
     """Get annotations for a PDF file"""
     try:
-        upload_dir = PathLib(UPLOAD_DIR)
-        annotations_file = upload_dir / f"{file_id}_annotations.json"
+        annotations_file = UPLOAD_DIR_PATH / f"{file_id}_annotations.json"
         
-        if not annotations_file.exists():
+        try:
+            return await asyncio.to_thread(_read_json, annotations_file)
+        except FileNotFoundError:
             return {
                 "file_id": file_id,
                 "annotations": [],
                 "message": "No annotations found"
             }
         
-        with open(annotations_file, 'r') as f:
-            annotations_data = json.load(f)
-        
-        return annotations_data
-        
     except Exception as e:
-        logger.error(f"Error getting annotations: {str(e)}")
+        logger.error("Error getting annotations: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to get annotations"
@@ -365,25 +489,29 @@ async def export_pdf_with_annotations(file_id: str = Path(..., description="File
         # TODO: Implement PDF export with annotations using PDF processing library
         # This would use PyPDF2 or reportlab to merge annotations into the PDF
         
-        upload_dir = PathLib(UPLOAD_DIR)
-        
         # Find original file
-        file_pattern = f"{file_id}_*"
-        matching_files = list(upload_dir.glob(file_pattern))
+        original_file = find_upload(file_id)
         
-        if not matching_files:
+        if original_file is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"File with ID {file_id} not found"
             )
         
-        original_file = matching_files[0]
+        try:
+            stat_result = os.stat(original_file)
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="File not found"
+            )
         
         # For now, return the original file (TODO: apply annotations)
         return FileResponse(
             path=str(original_file),
             filename=f"exported_{original_file.name}",
             media_type="application/pdf",
+            stat_result=stat_result,
             headers={
                 "Content-Disposition": f"attachment; filename=exported_{original_file.name}"
             }
@@ -392,7 +520,7 @@ async def export_pdf_with_annotations(file_id: str = Path(..., description="File
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error exporting PDF: {str(e)}")
+        logger.error("Error exporting PDF: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to export PDF"
@@ -402,30 +530,26 @@ async def export_pdf_with_annotations(file_id: str = Path(..., description="File
 async def extract_text_with_ocr(file_id: str = Path(..., description="File ID")):
     """Extract text from PDF using OCR and native text extraction"""
     try:
-        upload_dir = PathLib(UPLOAD_DIR)
-        
         # Find the file with the given ID
-        file_pattern = f"{file_id}_*"
-        matching_files = list(upload_dir.glob(file_pattern))
+        file_path = find_upload(file_id)
         
-        if not matching_files:
+        if file_path is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"File with ID {file_id} not found"
             )
         
-        file_path = matching_files[0]
-        
         if not file_path.exists():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found"
             )
         
-        # Extract text using OCR service
-        text_data = ocr_service.extract_text_from_pdf(str(file_path))
+        # Extract text using OCR service; the content digest in the ID doubles as its cache key
+        content_hash = content_hash_of(file_id)
+        text_data = get_ocr_service().extract_text_from_pdf(str(file_path), content_hash)
         
-        logger.info(f"Extracted text from PDF {file_id}: {text_data['total_pages']} pages, confidence: {text_data['confidence_score']:.2f}")
+        logger.info("Extracted text from PDF %s: %d pages, confidence: %.2f", file_id, text_data['total_pages'], text_data['confidence_score'])
         
         return {
             "file_id": file_id,
@@ -437,7 +561,7 @@ async def extract_text_with_ocr(file_id: str = Path(..., description="File ID"))
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"OCR extraction error: {str(e)}")
+        logger.error("OCR extraction error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"OCR text extraction failed: {str(e)}"
@@ -450,28 +574,24 @@ async def get_text_with_positions(
 ):
     """Get text with position information for a specific page"""
     try:
-        upload_dir = PathLib(UPLOAD_DIR)
-        
         # Find the file with the given ID
-        file_pattern = f"{file_id}_*"
-        matching_files = list(upload_dir.glob(file_pattern))
+        file_path = find_upload(file_id)
         
-        if not matching_files:
+        if file_path is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"File with ID {file_id} not found"
             )
         
-        file_path = matching_files[0]
-        
         if not file_path.exists():
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found"
             )
         
-        # Extract positioned text
-        text_elements = ocr_service.extract_text_with_positions(str(file_path), page_num)
+        # Extract positioned text; the content digest in the ID doubles as the per-page cache key
+        content_hash = content_hash_of(file_id)
+        text_elements = get_ocr_service().extract_text_with_positions(str(file_path), page_num, content_hash)
         
         return {
             "file_id": file_id,
@@ -483,7 +603,7 @@ async def get_text_with_positions(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Positioned text extraction error: {str(e)}")
+        logger.error("Positioned text extraction error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to extract positioned text: {str(e)}"
@@ -491,10 +611,16 @@ async def get_text_with_positions(
 
 if __name__ == "__main__":
     logger.info("Starting PDF Prodigy API...")
+    # Development keeps a single auto-reloading worker; ENV=production runs one
+    # worker per core on uvloop/httptools
+    production = os.getenv("ENV") == "production"
     uvicorn.run(
         "standalone_backend:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=not production,
+        workers=(os.cpu_count() or 1) if production else 1,
+        loop="uvloop" if production else "auto",
+        http="httptools" if production else "auto",
         log_level="info"
     )